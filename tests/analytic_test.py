@@ -0,0 +1,71 @@
+"""Test of the analytic evaluation of the DMR."""
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, RandomDelay, TimeGrid, analytic_report
+
+
+def create_network() -> Network:
+    """
+    Topology (mean delays), with low traffic so there is no queueing:
+
+          (2)
+         1 - 3
+     (1)/    |(3)
+     0 - 2 - 4 - 5
+      (4) (5) (6)
+
+    """
+    sink = SinkNode('0', name='sink')
+    sensing = {address: SensingNode(address, sensing_period=60*60, sensing_offset=int(address)*10*60)
+               for address in '12345'}
+    nodes = {'0': sink, **sensing}
+    links = {Link(nodes[node_1], nodes[node_2], RandomDelay(lambda rng, mean=mean: rng.expovariate(1 / mean)))
+             for node_1, node_2, mean in (('0', '1', 1), ('1', '3', 2), ('3', '4', 3),
+                                          ('0', '2', 4), ('2', '4', 5), ('4', '5', 6))}
+    return Network(set(nodes.values()), links)
+
+
+def test_1():
+    """With fixed routes the analytic DMR is close to the simulated one."""
+    for routing_policy in ('min-hop', 'etx'):
+        analytic = analytic_report(create_network(), routing_policy, 20, samples_per_link=5000)
+        simulation = Simulation(create_network(), routing_policy, 20)
+        simulation.run(100*24*60*60)
+        simulated = simulation.report()
+        assert list(analytic) == list(simulated)
+        for address, report in analytic.items():
+            assert abs(report.dmr - simulated[address].dmr) < 0.03
+            assert abs(report.mean - simulated[address].mean) < 0.5
+            assert abs(report.histogram_counts.sum() - 1) < 1e-9
+
+
+def test_2():
+    """An explicit route of fixed delays gives a step distribution."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1')
+    sensing_2 = SensingNode('2')
+    links = {Link(sink, sensing_1, lambda: 3), Link(sensing_1, sensing_2, lambda: 4), Link(sink, sensing_2, lambda: 1)}
+    network = Network({sink, sensing_1, sensing_2}, links)
+    grid = TimeGrid.uniform(1, 30)
+    report = analytic_report(network, {'1': '0', '2': '1'}, 7, grid, samples_per_link=10)
+    assert report['2'].dmr == 0 and report['2'].mean == 7 and report['2'].quantiles[0.5] == 7
+    assert analytic_report(network, {'1': '0', '2': '1'}, 6, grid, samples_per_link=10)['2'].dmr == 1
+    # Min-hop goes through the direct link
+    assert analytic_report(network, 'min-hop', 6, grid, samples_per_link=10)['2'].mean == 1
+
+
+def test_3():
+    """With DAP the analytic DMR, which keeps the next hops of the full deadline, is close to the simulated one."""
+    analytic = analytic_report(create_network(), 'dap', 20, samples_per_link=5000)
+    simulation = Simulation(create_network(), 'dap', 20)
+    simulation.run(100*24*60*60)
+    simulated = simulation.report()
+    assert list(analytic) == list(simulated)
+    # The mean delays differ: the simulated packets change next hop as their remaining time decreases
+    for address, report in analytic.items():
+        assert abs(report.dmr - simulated[address].dmr) < 0.02
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,58 @@
+"""Test of the block-sampling delay source of the links."""
+
+import numpy as np
+
+from wsnsim import SinkNode, SensingNode, Link, BatchDelay
+
+
+def test_1():
+    """The samples are served in order across the block boundaries, one block drawn at a time."""
+    blocks = []
+
+    def sampler(size: int, _rng: np.random.Generator) -> np.ndarray:
+        """Returns consecutive numbers, so the order of the samples can be checked."""
+        blocks.append(size)
+        start = 3 * (len(blocks) - 1)
+        return np.arange(start, start + size, dtype=float)
+
+    link = Link(SinkNode('0'), SensingNode('1'), BatchDelay(sampler, block_size=3))
+    samples = [link.get_delay() for _ in range(7)]
+    assert samples == [0, 1, 2, 3, 4, 5, 6]
+    assert blocks == [3, 3, 3]
+
+
+def test_2():
+    """A negative sample anywhere in a block is rejected when the block is drawn."""
+    def sampler(size: int, _rng: np.random.Generator) -> np.ndarray:
+        """Returns a block whose last sample is negative."""
+        block = np.ones(size)
+        block[-1] = -1
+        return block
+
+    link = Link(SinkNode('0'), SensingNode('1'), BatchDelay(sampler, block_size=4))
+    try:
+        link.get_delay()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('The negative sample was accepted')
+
+
+def test_3():
+    """Restarting the source with the same seed gives the same sequence, another seed a different one."""
+    link = Link(SinkNode('0'), SensingNode('1'),
+                BatchDelay(lambda size, rng: rng.exponential(2, size), block_size=5))
+    link.seed_delay_source(7)
+    first = [link.get_delay() for _ in range(12)]
+    link.seed_delay_source(7)
+    second = [link.get_delay() for _ in range(12)]
+    link.seed_delay_source(8)
+    other = [link.get_delay() for _ in range(12)]
+    assert first == second
+    assert first != other
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
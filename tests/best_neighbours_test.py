@@ -0,0 +1,43 @@
+"""Test of the cache of the neighbours with the minimum metric."""
+
+from random import Random
+
+from wsnsim.routing.best_neighbours import BestNeighbours, COMPACTION_SLACK
+
+
+def test_1():
+    """The cached neighbours are the ones with minimum metric after every change."""
+    generator = Random(19)
+    metrics = {}
+    best_neighbours = BestNeighbours()
+    for _ in range(2000):
+        address = str(generator.randrange(30))
+        metrics[address] = generator.randint(1, 8)
+        best_neighbours.update(address, metrics[address])
+        min_metric = min(metrics.values())
+        expected = {address for address, metric in metrics.items() if metric == min_metric}
+        obtained = best_neighbours.addresses()
+        assert set(obtained) == expected and len(obtained) == len(expected)
+
+
+def test_2():
+    """As in ETX, the chosen neighbour gets a new (mostly worse) metric after every packet."""
+    generator = Random(20)
+    metrics = {str(address): generator.uniform(1, 10) for address in range(200)}
+    best_neighbours = BestNeighbours()
+    for address, metric in metrics.items():
+        best_neighbours.update(address, metric)
+    for _ in range(5000):
+        min_metric = min(metrics.values())
+        assert best_neighbours.addresses() == [address for address, metric in metrics.items() if metric == min_metric]
+        chosen = generator.choice(best_neighbours.addresses())
+        metrics[chosen] += generator.uniform(-0.1, 1)
+        best_neighbours.update(chosen, metrics[chosen])
+        # The outdated entries do not accumulate
+        # noinspection PyProtectedMember
+        assert len(best_neighbours._heap) <= 2 * len(metrics) + COMPACTION_SLACK
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
@@ -0,0 +1,93 @@
+"""Test of the offline solver of the converged routing state."""
+
+from random import expovariate
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, RandomDelay
+from wsnsim.convergence import (converged_hop_counts, converged_etx, converged_daps,
+                                sample_link_delays)
+
+
+def create_network() -> Network:
+    """
+    Topology (fixed delays), node 6 has no path to the sink:
+
+          (2)
+         1 - 3
+     (1)/    |(3)
+     0 - 2 - 4 - 5   6
+      (4) (5) (6)
+
+    """
+    sink = SinkNode('0', name='sink')
+    sensing = {address: SensingNode(address) for address in '123456'}
+    nodes = {sink, *sensing.values()}
+    links = {
+        Link(sink, sensing['1'], lambda: 1),
+        Link(sensing['1'], sensing['3'], lambda: 2),
+        Link(sensing['3'], sensing['4'], lambda: 3),
+        Link(sink, sensing['2'], lambda: 4),
+        Link(sensing['2'], sensing['4'], lambda: 5),
+        Link(sensing['4'], sensing['5'], lambda: 6),
+    }
+    return Network(nodes, links)
+
+
+def test_1():
+    """The converged metrics are the ones of the best paths."""
+    network = create_network()
+    delay_samples = sample_link_delays(network, 10)
+    assert converged_hop_counts(network) == {'0': 0, '1': 1, '2': 1, '3': 2, '4': 2, '5': 3}
+    assert converged_etx(network, delay_samples) == {'0': 0, '1': 1, '2': 4, '3': 3, '4': 6, '5': 12}
+    daps = converged_daps(network, delay_samples)
+    assert set(daps) == {'0', '1', '2', '3', '4', '5'}
+    for address, delay in (('1', 1), ('2', 4), ('3', 3), ('4', 6), ('5', 12)):
+        # With fixed delays the DAP is a step at the delay of the best path
+        assert daps[address].get_dap(delay) == 1 and daps[address].get_dap(delay - 1) == 0
+
+
+def test_2():
+    """Warm started nodes route through the best neighbours from the beginning."""
+    for routing_protocol, metric in (('min-hop', 'hop_count'), ('etx', 'etx')):
+        simulation = Simulation(create_network(), routing_protocol, 20)
+        simulation.warm_start(samples_per_link=10)
+        nodes = {node.address: node.routing_protocol for node in simulation.network.nodes}
+        assert sorted(nodes['4']._neighbours) == ['2', '3', '5']
+        assert not nodes['6']._neighbours
+        assert getattr(nodes['5'], metric) == {'min-hop': 3, 'etx': 12}[routing_protocol]
+        assert nodes['5']._choose_next_hop_address('sink') == '4'
+    simulation = Simulation(create_network(), 'dap', 20)
+    simulation.warm_start(samples_per_link=10)
+    node_4 = next(node for node in simulation.network.nodes if node.address == '4').routing_protocol
+    assert node_4.dap.get_dap(6) == 1 and node_4.dap.get_dap(5) == 0
+    assert node_4._choose_next_hop_address('sink', 6) == '3'
+
+
+def test_3():
+    """The simulation does not replay the delays sampled for the warm start."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=60)
+    sensing_2 = SensingNode('2', sensing_period=60)
+    links = {Link(sink, sensing_1, RandomDelay(lambda rng: rng.expovariate(1 / 2))),
+             Link(sensing_1, sensing_2, lambda: expovariate(1 / 3))}
+    simulation = Simulation(Network({sink, sensing_1, sensing_2}, links), 'etx', 20)
+    delays = {}
+    for link in simulation.network.links:
+        def recorded_delay(get_delay=link.get_delay, link_delays=delays.setdefault(link, [])):
+            """Returns a delay of the link and keeps it."""
+            delay = get_delay()
+            link_delays.append(delay)
+            return delay
+
+        link.get_delay = recorded_delay
+    simulation.warm_start(samples_per_link=10)
+    warm_start_delays = {link: link_delays[:] for link, link_delays in delays.items()}
+    simulation.run(60*60)
+    for link, link_delays in delays.items():
+        assert len(link_delays) > 20
+        assert set(link_delays[10:20]).isdisjoint(warm_start_delays[link])
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
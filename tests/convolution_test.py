@@ -0,0 +1,42 @@
+"""Test of the vectorized convolution of a DAP with a delay pdf."""
+
+from random import Random
+
+from wsnsim.routing.dap import DAP, DelayPDF, convolution_of_dap_with_delay_pdf
+
+
+def reference_convolution(dap_vector: list, delay_pdf_vector: list) -> list:
+    """Previous pure-Python implementation, used as reference."""
+    dap_length = len(dap_vector)
+    new_dap = [0.0]*dap_length
+    for delay_index, delay_value in enumerate(delay_pdf_vector):
+        for dap_index, dap_value in enumerate(dap_vector):
+            new_dap_index = delay_index + dap_index
+            new_dap_probability = delay_value*dap_value
+            if new_dap_index < dap_length - 1:
+                new_dap[new_dap_index] += new_dap_probability
+            else:
+                new_dap[-1] += new_dap_probability
+    if new_dap[-1] > 1:
+        new_dap[-1] = 1.0
+    return new_dap
+
+
+def test_1():
+    """Both implementations give the same DAP for random DAPs and delays."""
+    generator = Random(6)
+    for _ in range(50):
+        delay_pdf = DelayPDF()
+        for _ in range(generator.randint(1, 200)):
+            delay_pdf.update_with_new_sample(generator.expovariate(1 / generator.uniform(1, 40)))
+        # A DAP is non-decreasing and at most 1
+        dap_vector = sorted(generator.random() for _ in range(len(delay_pdf)))
+        for dap in (DAP(dap_vector), DAP(sink=True), DAP()):
+            expected = reference_convolution(dap.dap_vector, list(delay_pdf.delay_pdf_vector))
+            obtained = convolution_of_dap_with_delay_pdf(dap, delay_pdf).dap_vector
+            assert len(obtained) == len(expected)
+            assert all(abs(value - expected_value) < 1e-12 for value, expected_value in zip(obtained, expected))
+
+
+if __name__ == '__main__':
+    test_1()
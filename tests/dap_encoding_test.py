@@ -0,0 +1,59 @@
+"""Test of the binary encodings of the DAP advertisements."""
+
+from random import Random
+
+import numpy as np
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation
+from wsnsim.packet import Packet, PacketKind
+from wsnsim.routing import DAPRouting
+from wsnsim.routing.dap import DAP_ENCODINGS, DAP_QUANTIZATION_LEVELS, encode_dap, decode_dap
+
+
+def test_1():
+    """The decoded DAPs are within the documented error and have the expected size."""
+    generator = Random(15)
+    maximum_errors = {
+        'float64': 0.0,
+        'float32': 2 ** -24,  # Relative error
+        'uint16': 1 / (2 * DAP_QUANTIZATION_LEVELS),  # Absolute error
+    }
+    for _ in range(100):
+        dap_vector = [0.0] + sorted(generator.random() for _ in range(29)) + [1.0]
+        for encoding, dtype in DAP_ENCODINGS.items():
+            payload = encode_dap(dap_vector, encoding)
+            # One byte tags the encoding
+            assert Packet(PacketKind.DAP, payload).payload_size == 1 + len(dap_vector) * dtype.itemsize
+            decoded = decode_dap(payload)
+            assert not decoded.flags.writeable
+            errors = np.abs(decoded - dap_vector)
+            if encoding == 'float32':
+                errors /= np.maximum(dap_vector, 1e-300)
+                # Zero-copy view of the payload
+                assert not decoded.flags.owndata
+            assert errors.max() <= maximum_errors[encoding]
+            # The limits of the probabilities are exact
+            assert decoded[0] == 0 and decoded[-1] == 1
+
+
+def test_2():
+    """The advertisements are decoded with the encoding of the sender, not the one of the receiver."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=10*60)
+    sensing_2 = SensingNode('2', sensing_period=10*60)
+    links = {Link(sink, sensing_1, lambda: 3), Link(sensing_1, sensing_2, lambda: 4)}
+    network = Network({sink, sensing_1, sensing_2}, links)
+    # The sink keeps the default encoding
+    DAPRouting.dap_encoding = 'uint16'
+    try:
+        simulation = Simulation(network, 'dap', 10)
+        simulation.run(6*60*60)
+    finally:
+        del DAPRouting.dap_encoding
+    report = simulation.report()
+    assert report['1'].dmr == report['2'].dmr == 0
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
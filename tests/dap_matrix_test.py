@@ -0,0 +1,104 @@
+"""Test of the matrix of the DAP through every neighbour and of the table of best next hops."""
+
+from random import Random
+
+from simpy import Environment
+
+from wsnsim.packet import Packet, PacketKind
+from wsnsim.routing.dap import DAPRouting, encode_dap
+
+
+def radio(_packet):
+    """Radio that sends nothing."""
+    yield from ()
+
+
+def test_1():
+    """The own DAP and the best next hops match a loop over the neighbours."""
+    generator = Random(17)
+    node = DAPRouting('node', radio, Environment())
+    node.dap_encoding = 'float64'
+    addresses = [f'n{i}' for i in range(60)]
+    for address in addresses:
+        node.receive_packet(Packet(PacketKind.HELLO, origin=address, destination=''))
+    for _ in range(3):
+        for address in generator.sample(addresses, 20):
+            neighbour = node._neighbours[address]
+            for _ in range(generator.randint(1, 20)):
+                # The neighbour itself tells the node that its row is outdated
+                neighbour.update_link_delay_pdf(generator.expovariate(1 / generator.uniform(1, 10)))
+            dap_vector = sorted(generator.choice((0.25, 0.5, generator.random())) for _ in range(len(node.dap)))
+            packet = Packet(PacketKind.DAP, encode_dap(dap_vector, 'float64'), origin=address, destination='')
+            node.receive_packet(packet)
+        node.update_dap()
+        assert node.dap_matrix.shape == (len(addresses), len(node.time_grid))
+        for index, deadline in enumerate(node.time_grid.edges[:-1]):
+            daps = {address: neighbour.get_dap_through_neighbour(deadline)
+                    for address, neighbour in node._neighbours.items()}
+            max_dap = max(daps.values())
+            assert node.dap.dap_vector[index] == max_dap
+            best_next_hops = {address for address, dap in daps.items() if dap >= max_dap}
+            for _ in range(5):
+                assert node._find_max_dap_neighbour(deadline) in best_next_hops
+
+
+def test_2():
+    """The table of best next hops is built again when the link or the DAP of a neighbour changes."""
+    env = Environment()
+    link_delays = {}
+
+    def delayed_radio(packet: Packet):
+        """Radio where every neighbour has a fixed delay."""
+        yield env.timeout(link_delays.get(packet.destination, 0))
+
+    node = DAPRouting('node', delayed_radio, env, deadline=10)
+    for address in 'ab':
+        node.receive_packet(Packet(PacketKind.HELLO, origin=address, destination=''))
+        packet = Packet(PacketKind.DAP, encode_dap([1] * len(node.dap)), origin=address, destination='')
+        node.receive_packet(packet)
+
+    def probe(address: str, delay: float) -> None:
+        """Sends a probe through the output queue, so the link delay pdf is updated."""
+        link_delays[address] = delay
+        env.process(node.add_to_output_queue(Packet(PacketKind.PROBE), address))
+        env.run()
+
+    def best_next_hops(deadline: float) -> set:
+        """Returns the next hops chosen for a deadline."""
+        return {node._find_max_dap_neighbour(deadline) for _ in range(30)}
+
+    probe('a', 2)
+    assert best_next_hops(5) == {'a'}
+    assert node._best_next_hops is not None
+    # The link of 'b' changes
+    probe('b', 1)
+    assert node._best_next_hops is None
+    assert best_next_hops(1) == {'b'}
+    assert best_next_hops(5) == {'a', 'b'}
+    # The DAP of 'b' changes
+    node.receive_packet(Packet(PacketKind.DAP, encode_dap([0] * len(node.dap)), origin='b', destination=''))
+    assert node._best_next_hops is None
+    assert best_next_hops(5) == {'a'}
+    assert best_next_hops(1) == {'a', 'b'}
+
+
+def test_3():
+    """A change of a neighbour made outside the node refreshes its row, and the rows survive the growth."""
+    node = DAPRouting('node', radio, Environment())
+    addresses = [f'n{i}' for i in range(20)]
+    # Neighbour i has a link delay of i + 1 seconds
+    node.warm_start({address: [1] * len(node.dap) for address in addresses},
+                    {address: [row + 1] for row, address in enumerate(addresses)})
+    neighbours = node._neighbours
+    for row, address in enumerate(addresses):
+        assert node.dap_matrix[row].tolist() == neighbours[address].dap_through_neighbour.dap_vector
+    assert node.dap_matrix[3, node.time_grid.index(5)] == 1
+    neighbours['n3'].update_link_delay_pdf(100)
+    # Half of the samples of the link are beyond a deadline of 5 seconds
+    assert node.dap_matrix[3, node.time_grid.index(5)] == 0.5
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,47 @@
+"""Test of the delay pdf backed by a histogram of counts."""
+
+from random import Random
+
+from wsnsim import TimeGrid
+from wsnsim.routing.dap import DelayPDF
+
+
+def test_1():
+    """The normalized counts match rescaling the pdf with every new sample."""
+    generator = Random(11)
+    for grid in (TimeGrid.uniform(), TimeGrid.uniform(0.1, 5), TimeGrid([0, 0.5, 2, 7, 20])):
+        delay_pdf = DelayPDF(grid)
+        assert not delay_pdf.delay_pdf_vector.any()
+        rescaled = [0.0] * len(grid)
+        for number_of_samples in range(1, 501):
+            sample = generator.expovariate(1 / generator.uniform(0.1, 2 * grid.duration))
+            delay_pdf.update_with_new_sample(sample)
+            # The pdf is denormalized, the sample is added and it is normalized again
+            rescaled = [value * (number_of_samples - 1) for value in rescaled]
+            rescaled[grid.index(sample)] += 1
+            rescaled = [value / number_of_samples for value in rescaled]
+            assert delay_pdf.number_of_samples == number_of_samples
+            assert all(abs(value - expected) < 1e-12 for value, expected in zip(delay_pdf.delay_pdf_vector, rescaled))
+        assert abs(delay_pdf.delay_pdf_vector.sum() - 1) < 1e-12
+
+
+def test_2():
+    """The normalized pdf is kept until a new sample arrives and cannot be modified."""
+    delay_pdf = DelayPDF()
+    delay_pdf.update_with_new_sample(3)
+    vector = delay_pdf.delay_pdf_vector
+    assert delay_pdf.delay_pdf_vector is vector
+    try:
+        vector[0] = 1
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('The pdf was modified')
+    delay_pdf.update_with_new_sample(5)
+    assert delay_pdf.delay_pdf_vector is not vector
+    assert delay_pdf.delay_pdf_vector[3] == delay_pdf.delay_pdf_vector[5] == 0.5
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
@@ -0,0 +1,31 @@
+"""Test of the streaming end-to-end delay statistics."""
+
+from random import Random
+from statistics import mean, variance, quantiles
+
+from wsnsim.delay_statistics import DelayStatistics
+
+
+def test_1():
+    """Statistics match the exact values and can be merged."""
+    generator = Random(1)
+    delays = [generator.expovariate(1 / 8) for _ in range(20000)]
+    deadline = 20
+    first_half, second_half = DelayStatistics(deadline), DelayStatistics(deadline)
+    for delay in delays[:10000]:
+        first_half.update(delay)
+    for delay in delays[10000:]:
+        second_half.update(delay)
+    first_half.merge(second_half)
+    assert first_half.count == len(delays)
+    assert first_half.dmr == sum(delay > deadline for delay in delays) / len(delays)
+    assert abs(first_half.mean - mean(delays)) < 1e-9
+    assert abs(first_half.variance - variance(delays)) < 1e-6
+    assert sum(first_half.histogram.counts) == len(delays)
+    # The quantiles have a relative error below the accuracy of the sketch (1 %)
+    for q, exact_quantile in zip((0.1, 0.5, 0.9), quantiles(delays, n=10)[::4]):
+        assert abs(first_half.quantile(q) - exact_quantile) / exact_quantile < 0.02
+
+
+if __name__ == '__main__':
+    test_1()
@@ -0,0 +1,45 @@
+"""Benchmark of the time needed to import the library.
+
+Every process pays it, so heavy optional dependencies (matplotlib, scipy)
+must only be imported by the features that need them.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+MAX_IMPORT_TIME = 1.0  # In seconds, importing matplotlib alone takes about half of it
+REPETITIONS = 5
+HEAVY_MODULES = ('matplotlib', 'scipy')
+
+_MEASUREMENT = '''
+import json, sys, time
+start = time.perf_counter()
+import wsnsim
+elapsed = time.perf_counter() - start
+print(json.dumps({'time': elapsed, 'modules': [m for m in %r if m in sys.modules]}))
+''' % (HEAVY_MODULES,)
+
+
+def measure_import() -> dict:
+    """Imports the library in a new interpreter and returns the time and heavy modules loaded."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_root, env.get('PYTHONPATH')]))
+    output = subprocess.run([sys.executable, '-c', _MEASUREMENT], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_1():
+    """The import is fast and does not load heavy optional dependencies."""
+    measurements = [measure_import() for _ in range(REPETITIONS)]
+    best_time = min(measurement['time'] for measurement in measurements)
+    assert measurements[0]['modules'] == []
+    assert best_time < MAX_IMPORT_TIME, \
+        f'Import time of wsnsim: {best_time * 1000:.1f} ms (best of {REPETITIONS})'
+
+
+if __name__ == '__main__':
+    test_1()
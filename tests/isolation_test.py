@@ -0,0 +1,71 @@
+"""Test that the settings of a simulation do not change the simulations built before it."""
+
+from io import StringIO
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, Tracer, Retention, TimeGrid, LinkEstimator
+from wsnsim.tracing import DISABLED_TRACER
+
+
+def create_network() -> Network:
+    """Line of three nodes with fixed delays."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=10*60)
+    sensing_2 = SensingNode('2', sensing_period=10*60)
+    links = {Link(sink, sensing_1, lambda: 3), Link(sensing_1, sensing_2, lambda: 4)}
+    return Network({sink, sensing_1, sensing_2}, links)
+
+
+def test_1():
+    """A simulation keeps tracing to its own file after a simulation without tracer is built."""
+    network = create_network()
+    file = StringIO()
+    traced = Simulation(network, 'etx', 10, tracer=Tracer(file=file))
+    Simulation(network, 'etx', 10)
+    traced.run(2*60*60)
+    assert len(file.getvalue().splitlines()) > 100
+    # noinspection PyProtectedMember
+    assert not DISABLED_TRACER._lines
+
+
+def test_2():
+    """The online statistics of a simulation use its own deadline after another simulation is built."""
+    network = create_network()
+    simulation = Simulation(network, 'etx', 5, log_retention={'received': Retention.off()})
+    Simulation(network, 'etx', 1000)
+    simulation.run(24*60*60)
+    report = simulation.report()
+    # The delay of node 1 is 3 seconds and the one of node 2 is 7 seconds
+    assert report['1'].dmr == 0
+    assert report['2'].dmr == 1
+
+
+def test_3():
+    """A DAP simulation keeps its time grid after a simulation with another grid is built."""
+    network = create_network()
+    simulation = Simulation(network, 'dap', 10)
+    Simulation(network, 'dap', 10, time_grid=TimeGrid.uniform(resolution=0.5, duration=60))
+    simulation.run(24*60*60)
+    report = simulation.report()
+    assert report['1'].dmr == 0
+    assert report['2'].dmr == 0
+    for node in simulation.network.nodes:
+        assert node.routing_protocol.dap_matrix.shape[1] == len(simulation.time_grid)
+
+
+def test_4():
+    """The neighbours found by an ETX simulation use its own link estimator."""
+    network = create_network()
+    simulation = Simulation(network, 'etx', 10, link_estimator=LinkEstimator.window(5))
+    Simulation(network, 'etx', 10, link_estimator=LinkEstimator.ewma(0.5))
+    simulation.run(60*60)
+    for node in simulation.network.nodes:
+        # noinspection PyProtectedMember
+        for neighbour in node.routing_protocol._neighbours.values():
+            assert type(neighbour.link_etx) is type(LinkEstimator.window(5).new())
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
+    test_4()
@@ -0,0 +1,47 @@
+"""Test of the lazy computation of the DAP through a neighbour."""
+
+import numpy as np
+
+from wsnsim.routing import dap
+from wsnsim.routing.dap import Neighbour
+
+
+def count_convolutions(function):
+    """Returns a wrapper of the convolution that counts its calls."""
+    def counted(*arguments):
+        counted.calls += 1
+        return function(*arguments)
+
+    counted.calls = 0
+    return counted
+
+
+def test_1():
+    """Many probes and one query need one convolution, a query without new information needs none."""
+    convolution = dap.convolution_of_dap_with_delay_pdf
+    counted = count_convolutions(convolution)
+    dap.convolution_of_dap_with_delay_pdf = counted
+    try:
+        neighbour = Neighbour('1')
+        neighbour.update_dap(np.linspace(0, 1, len(neighbour.dap)))
+        for delay in range(50):
+            neighbour.update_link_delay_pdf(delay % 7)
+        assert counted.calls == 0
+        first = neighbour.get_dap_through_neighbour(10)
+        assert counted.calls == 1
+        assert neighbour.get_dap_through_neighbour(20) >= first
+        assert neighbour.dap_through_neighbour.dap_vector == \
+            convolution(neighbour.dap, neighbour.link_delay_pdf).dap_vector
+        assert counted.calls == 1
+        # A new DAP, or a new sample, is convolved once at the next query
+        neighbour.update_dap(np.ones(len(neighbour.dap)))
+        neighbour.update_link_delay_pdf(3)
+        assert neighbour.get_dap_through_neighbour(10) == 1
+        neighbour.get_dap_through_neighbour(5)
+        assert counted.calls == 2
+    finally:
+        dap.convolution_of_dap_with_delay_pdf = convolution
+
+
+if __name__ == '__main__':
+    test_1()
@@ -0,0 +1,57 @@
+"""Test of the estimators of the mean link delay used by ETX."""
+
+from random import Random
+from statistics import mean
+
+from wsnsim import LinkEstimator
+from wsnsim.routing.etx import Neighbour
+
+
+def test_1():
+    """The estimators agree with the mean of the samples they use."""
+    generator = Random(18)
+    samples = [generator.expovariate(1 / 5) for _ in range(500)]
+    running_mean = LinkEstimator.mean().new()
+    window = LinkEstimator.window(20).new()
+    ewma = LinkEstimator.ewma(0.1).new()
+    assert running_mean.value is None and window.value is None and ewma.value is None
+    expected_ewma = samples[0]
+    for index, sample in enumerate(samples):
+        running_mean.update(sample)
+        window.update(sample)
+        ewma.update(sample)
+        if index:
+            expected_ewma = 0.9 * expected_ewma + 0.1 * sample
+        assert abs(running_mean.value - mean(samples[:index + 1])) < 1e-9
+        assert abs(window.value - mean(samples[max(0, index - 19):index + 1])) < 1e-9
+        assert abs(ewma.value - expected_ewma) < 1e-9
+
+
+def test_2():
+    """The total ETX of a neighbour adds the estimated link delay."""
+    neighbour = Neighbour('1', link_estimator=LinkEstimator.window(2))
+    neighbour.update_etx(10)
+    assert neighbour.total_etx == 10
+    for sample in (1, 2, 4):
+        neighbour.update_link_etx(sample)
+    assert neighbour.total_etx == 13
+    neighbour.update_etx(20)
+    assert neighbour.total_etx == 23
+
+
+def test_3():
+    """A missing or invalid parameter raises ValueError."""
+    for kind, parameter in (('ewma', None), ('ewma', 0), ('ewma', 1.5), ('window', None), ('window', 0),
+                            ('window', 2.5), ('mean', 3), ('median', None)):
+        try:
+            LinkEstimator(kind, parameter)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{kind} with {parameter} was accepted')
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,80 @@
+"""Test of the wireless medium and its adjacency index."""
+
+from random import Random
+from typing import Optional
+
+from simpy import Environment
+
+from wsnsim.link import SimulationLink
+from wsnsim.medium import Medium
+from wsnsim.packet import Packet, PacketKind, BROADCAST
+
+
+class Node:
+    """Node that keeps the packets it receives."""
+
+    def __init__(self, address: str, deliveries: Optional[list] = None) -> None:
+        self.address = address
+        self.received = []
+        # Shared by several nodes, to check the order of the deliveries
+        self.deliveries = deliveries if deliveries is not None else []
+
+    def receive_message(self, packet) -> None:
+        """Keeps a received packet."""
+        self.received.append(packet)
+        self.deliveries.append(self.address)
+
+
+def test_1():
+    """The index agrees with a scan of the links after links are added and removed."""
+    generator = Random(1)
+    nodes = [Node(str(address)) for address in range(12)]
+    medium = Medium(Environment())
+    links = {}
+    for _ in range(500):
+        node_1, node_2 = generator.sample(nodes, 2)
+        addresses = frozenset((node_1.address, node_2.address))
+        if addresses in links and generator.random() < 0.7:
+            medium.remove_link(links.pop(addresses))
+        elif addresses not in links:
+            links[addresses] = SimulationLink(node_1, node_2, lambda: 1)
+            medium.add_link(links[addresses])
+        for node in nodes:
+            expected = {link for link in links.values() if node in link.nodes}
+            obtained = medium.get_all_links_of_node(node.address)
+            assert len(obtained) == len(expected) and set(obtained) == expected
+        for node_1 in nodes:
+            for node_2 in nodes:
+                addresses = frozenset((node_1.address, node_2.address))
+                try:
+                    link = medium.get_link_between_nodes(node_1.address, node_2.address)
+                except Exception:
+                    assert addresses not in links
+                else:
+                    assert links[addresses] is link
+
+
+def test_2():
+    """A broadcast reaches every neighbour once, without delay, in the order the links were added."""
+    env = Environment()
+    deliveries = []
+    origin, *neighbours = (Node(address, deliveries) for address in '0312')
+    medium = Medium(env)
+    medium.setup_links(SimulationLink(origin, neighbour, lambda: 5) for neighbour in neighbours)
+    arrivals = []
+
+    def send():
+        """Broadcasts a packet and records when the medium is done."""
+        yield env.process(medium.send_data_to_medium(Packet(PacketKind.HELLO, origin='0', destination=BROADCAST)))
+        arrivals.append(env.now)
+
+    env.process(send())
+    env.run()
+    assert deliveries == ['3', '1', '2']
+    assert arrivals == [0]
+    assert not origin.received
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
@@ -0,0 +1,39 @@
+"""Test of the dispatch of the packets by kind."""
+
+from simpy import Environment
+
+from wsnsim.packet import Packet, PacketKind
+from wsnsim.routing import MinHopRouting, DAPRoutingSink
+
+
+def radio(_packet):
+    """Radio that sends nothing."""
+    yield from ()
+
+
+def test_1():
+    """Every kind goes to its handler and a kind without handler raises ValueError."""
+    node = MinHopRouting('1', radio, Environment())
+    node.receive_packet(Packet(PacketKind.HELLO, 2, origin='2', destination=''))
+    assert node.hop_count == 3
+    try:
+        node.receive_packet(Packet(PacketKind.ETX, 5.0, origin='2', destination=''))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('The ETX packet was accepted by a min-hop node')
+    # The packet is logged before it is rejected
+    assert len(node.recorder.received) == 2
+
+
+def test_2():
+    """The DAP sink ignores the DAP advertisements of its neighbours."""
+    sink = DAPRoutingSink('0', radio, Environment())
+    sink.receive_packet(Packet(PacketKind.HELLO, origin='1', destination=''))
+    sink.receive_packet(Packet(PacketKind.DAP, bytes(8), origin='1', destination=''))
+    assert sink.dap.dap_vector == [1] * len(sink.time_grid)
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
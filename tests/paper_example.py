@@ -3,7 +3,12 @@ Wireless Sensor Networks'."""
 
 from scipy.stats import gamma
 
-from wsnsim import SinkNode, SensingNode, Link, Network, Simulation
+from wsnsim import SinkNode, SensingNode, Link, BatchDelay, Network, Simulation
+
+
+def gamma_delay(alpha: float, beta: float) -> BatchDelay:
+    """Returns a delay source with a Gamma distribution, drawn in blocks of samples."""
+    return BatchDelay(lambda size, rng: gamma.rvs(alpha, scale=1/beta, size=size, random_state=rng))
 
 
 def test_1():
@@ -33,13 +38,13 @@ def test_1():
     alpha_34, beta_34 = 1.11, 0.44
     alpha_4s, beta_4s = 1.03, 0.25
     # Delays are random variables with a Gamma distribution as PDF
-    link_10 = Link(sensing_1, sink, lambda: gamma.rvs(alpha_1s, scale=1/beta_1s, size=1)[0])
-    link_20 = Link(sensing_2, sink, lambda: gamma.rvs(alpha_2s, scale=1/beta_2s, size=1)[0])
-    link_30 = Link(sensing_3, sink, lambda: gamma.rvs(alpha_3s, scale=1/beta_3s, size=1)[0])
-    link_40 = Link(sensing_4, sink, lambda: gamma.rvs(alpha_4s, scale=1/beta_4s, size=1)[0])
-    link_12 = Link(sensing_1, sensing_2, lambda: gamma.rvs(alpha_12, scale=1/beta_12, size=1)[0])
-    link_23 = Link(sensing_2, sensing_3, lambda: gamma.rvs(alpha_23, scale=1/beta_23, size=1)[0])
-    link_34 = Link(sensing_3, sensing_4, lambda: gamma.rvs(alpha_34, scale=1/beta_34, size=1)[0])
+    link_10 = Link(sensing_1, sink, gamma_delay(alpha_1s, beta_1s))
+    link_20 = Link(sensing_2, sink, gamma_delay(alpha_2s, beta_2s))
+    link_30 = Link(sensing_3, sink, gamma_delay(alpha_3s, beta_3s))
+    link_40 = Link(sensing_4, sink, gamma_delay(alpha_4s, beta_4s))
+    link_12 = Link(sensing_1, sensing_2, gamma_delay(alpha_12, beta_12))
+    link_23 = Link(sensing_2, sensing_3, gamma_delay(alpha_23, beta_23))
+    link_34 = Link(sensing_3, sensing_4, gamma_delay(alpha_34, beta_34))
     # Create network
     nodes = {sink, sensing_1, sensing_2, sensing_3, sensing_4}
     links = {link_10, link_20, link_30, link_40, link_12, link_23, link_34}
@@ -0,0 +1,53 @@
+"""Test of the performance report and of its plots."""
+
+import os
+from tempfile import TemporaryDirectory
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, Retention, RandomDelay, plot_report
+
+
+def create_network() -> Network:
+    """Line of three nodes with random delays."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=5*60)
+    sensing_2 = SensingNode('2', sensing_period=5*60)
+    links = {Link(sink, sensing_1, RandomDelay(lambda rng: rng.expovariate(1 / 3))),
+             Link(sensing_1, sensing_2, RandomDelay(lambda rng: rng.expovariate(1 / 4)))}
+    return Network({sink, sensing_1, sensing_2}, links)
+
+
+def test_1():
+    """The report from the online statistics agrees with the one from the logged delays."""
+    network = create_network()
+    logged = Simulation(network, 'min-hop', 8)
+    logged.run(10*24*60*60)
+    online = Simulation(network, 'min-hop', 8, log_retention={'received': Retention.off()})
+    online.run(10*24*60*60)
+    logged_report, online_report = logged.report(), online.report()
+    assert list(logged_report) == list(online_report) == ['1', '2']
+    for address, report in logged_report.items():
+        online_node_report = online_report[address]
+        assert report.deliveries == online_node_report.deliveries > 2000
+        assert report.dmr == online_node_report.dmr
+        assert abs(report.mean - online_node_report.mean) < 1e-9
+        assert abs(report.standard_deviation - online_node_report.standard_deviation) < 1e-6
+        # The quantiles of the online statistics have a relative error of about 1 %
+        for q, quantile in report.quantiles.items():
+            assert abs(online_node_report.quantiles[q] - quantile) / quantile < 0.02
+        assert report.histogram_counts.sum() == online_node_report.histogram_counts.sum() == report.deliveries
+    assert 0 < logged_report['1'].dmr < logged_report['2'].dmr < 1
+
+
+def test_2():
+    """Every node gets an image file, without opening any window."""
+    simulation = Simulation(create_network(), 'min-hop', 8)
+    simulation.run(24*60*60)
+    with TemporaryDirectory() as directory:
+        paths = plot_report(simulation.report(), os.path.join(directory, 'plots'))
+        assert [os.path.basename(path) for path in paths] == ['node_1.png', 'node_2.png']
+        assert all(os.path.getsize(path) > 0 for path in paths)
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
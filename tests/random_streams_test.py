@@ -0,0 +1,84 @@
+"""Test of the independent random streams of the links and nodes."""
+
+from threading import Thread
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, RandomDelay
+
+
+def create_network(prefix: str = '', mean_delay: float = 2) -> Network:
+    """Square of four nodes with random delays, so there are ties to break."""
+    sink = SinkNode(f'{prefix}0', name='sink')
+    sensing = {address: SensingNode(f'{prefix}{address}', sensing_period=10*60, sensing_offset=60)
+               for address in '123'}
+    links = {Link(sink, sensing['1'], RandomDelay(lambda rng: rng.expovariate(1 / mean_delay))),
+             Link(sink, sensing['2'], RandomDelay(lambda rng: rng.expovariate(1 / mean_delay))),
+             Link(sensing['1'], sensing['3'], RandomDelay(lambda rng: rng.expovariate(1 / 3))),
+             Link(sensing['2'], sensing['3'], RandomDelay(lambda rng: rng.expovariate(1 / 3)))}
+    return Network({sink, *sensing.values()}, links)
+
+
+def test_1():
+    """The samples of a link do not depend on the draws of the other links."""
+    network = create_network()
+    for link in network.links:
+        link.seed_delay_source(23)
+    sequential = {tuple(node.address for node in link.nodes): [link.get_delay() for _ in range(10)]
+                  for link in network.links}
+    for link in network.links:
+        link.seed_delay_source(23)
+    interleaved = {tuple(node.address for node in link.nodes): [] for link in network.links}
+    for _ in range(10):
+        for link in sorted(network.links, key=lambda link: [node.address for node in link.nodes], reverse=True):
+            interleaved[tuple(node.address for node in link.nodes)].append(link.get_delay())
+    assert sequential == interleaved
+    # Every link has its own stream
+    assert len({tuple(samples) for samples in sequential.values()}) == len(sequential)
+
+
+def test_2():
+    """Simulations running at the same time in threads give the same results as one by one."""
+    def run(results: dict, key: int) -> None:
+        simulation = Simulation(create_network(), 'min-hop', 5)
+        simulation.run(2*24*60*60, seed_value=key)
+        results[key] = {address: report.as_dict() for address, report in simulation.report().items()}
+
+    one_by_one, concurrent = {}, {}
+    for key in range(4):
+        run(one_by_one, key)
+    threads = [Thread(target=run, args=(concurrent, key)) for key in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert one_by_one == concurrent
+    assert one_by_one[0] != one_by_one[1]
+
+
+def test_3():
+    """Different networks, with addresses never seen before, can be simulated at the same time in threads."""
+    configurations = [(f'thread-{key}-', 1 + key, routing_protocol)
+                      for key, routing_protocol in enumerate(('min-hop', 'etx', 'dap') * 3)]
+
+    def run(results: dict, key: int) -> None:
+        prefix, mean_delay, routing_protocol = configurations[key]
+        simulation = Simulation(create_network(prefix, mean_delay), routing_protocol, 8)
+        simulation.run(24*60*60, seed_value=key)
+        results[key] = {address: report.as_dict() for address, report in simulation.report().items()}
+
+    concurrent, one_by_one = {}, {}
+    threads = [Thread(target=run, args=(concurrent, key)) for key in range(len(configurations))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for key in range(len(configurations)):
+        run(one_by_one, key)
+    assert concurrent == one_by_one
+    for key, (prefix, _, _) in enumerate(configurations):
+        assert list(concurrent[key]) == [f'{prefix}{address}' for address in '123']
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,29 @@
+"""Test of the retention policies of the message recorder."""
+
+from wsnsim.packet import Packet, PacketKind
+from wsnsim.recorder import EventLog, Retention, address_from_id
+
+
+def test_1():
+    """Every retention policy keeps the expected events, in order."""
+    packets = [Packet(PacketKind.DATA, 'X', '1', float(time)) for time in range(3000)]
+    full_log = EventLog('0', Retention.full())
+    ring_log = EventLog('0', Retention.ring(100))
+    off_log = EventLog('0', Retention.off())
+    for time, packet in enumerate(packets):
+        for log in (full_log, ring_log, off_log):
+            log.record(time + 0.5, packet, '1')
+    # Full retention grows and keeps everything
+    assert len(full_log) == 3000
+    assert full_log.column('created').tolist() == [float(time) for time in range(3000)]
+    # The ring buffer keeps the last events in chronological order
+    assert len(ring_log) == 100
+    assert ring_log.column('created').tolist() == [float(time) for time in range(2900, 3000)]
+    assert ring_log.column('packet').tolist() == [packet.packet_id for packet in packets[2900:]]
+    # Nothing is kept when the log is off, but events are still counted
+    assert len(off_log) == 0 and off_log.total == 3000
+    assert {address_from_id(source) for source in full_log.column('source')} == {'1'}
+
+
+if __name__ == '__main__':
+    test_1()
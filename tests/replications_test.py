@@ -0,0 +1,34 @@
+"""Test of the parallel replications of a simulation."""
+
+from random import expovariate
+
+from wsnsim import SinkNode, SensingNode, Link, Network, run_replications
+
+
+def create_network() -> Network:
+    """Line of three nodes with random delays."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=10*60, sensing_offset=60)
+    sensing_2 = SensingNode('2', sensing_period=10*60, sensing_offset=120)
+    links = {Link(sink, sensing_1, lambda: expovariate(1 / 2)),
+             Link(sensing_1, sensing_2, lambda: expovariate(1 / 3))}
+    return Network({sink, sensing_1, sensing_2}, links)
+
+
+def test_1():
+    """The results do not depend on the number of workers."""
+    network = create_network()
+    sequential = run_replications(network, 'etx', 6, 2*24*60*60, replications=4, workers=1)
+    parallel = run_replications(network, 'etx', 6, 2*24*60*60, replications=4, workers=3)
+    assert list(sequential) == list(parallel) == ['1', '2']
+    for address, report in sequential.items():
+        assert len(report.reports) == 4
+        assert [r.as_dict() for r in report.reports] == [r.as_dict() for r in parallel[address].reports]
+        lower, upper = report.dmr.interval
+        assert lower <= report.dmr.mean <= upper
+    # Different seeds give different replications
+    assert len({r.mean for r in sequential['2'].reports}) == 4
+
+
+if __name__ == '__main__':
+    test_1()
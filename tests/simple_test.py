@@ -1,6 +1,6 @@
 """Test of the simulator with 2 nodes and fixed delays."""
 
-from wsnsim import SinkNode, SensingNode, Link, Network, Simulation
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, Tracer
 
 
 def test_1():
@@ -25,7 +25,7 @@ def test_1():
     # Create simulation
     routing_protocol = 'min-hop'  # min-hop, etx or dap
     deadline = 20  # In seconds
-    simulation = Simulation(network, routing_protocol, deadline)
+    simulation = Simulation(network, routing_protocol, deadline, tracer=Tracer())  # Traces to stdout
     # Run the simulation
     simulation.run(2*60)  # Time in seconds
 
@@ -0,0 +1,61 @@
+"""Test of the sequential stopping rule and the warm-up removal."""
+
+from random import Random
+
+import numpy as np
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, RandomDelay
+from wsnsim.stopping import mser_truncation, batch_means_half_width, wilson_half_width
+
+
+def test_1():
+    """MSER-5 discards an initial transient and nothing of a stationary series."""
+    generator = Random(24)
+    stationary = np.array([float(generator.random() < 0.1) for _ in range(2000)])
+    assert mser_truncation(stationary) < 200
+    transient = np.concatenate((np.ones(300), stationary))
+    assert 250 <= mser_truncation(transient) <= 500
+    assert batch_means_half_width(stationary[:50], 0.95) == float('inf')
+    assert 0 < batch_means_half_width(stationary, 0.95) < 0.05
+
+
+def test_2():
+    """The simulation stops once the DMR of every node is precise enough."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=5*60, sensing_offset=60)
+    sensing_2 = SensingNode('2', sensing_period=5*60, sensing_offset=120)
+    links = {Link(sink, sensing_1, RandomDelay(lambda rng: rng.expovariate(1 / 2))),
+             Link(sensing_1, sensing_2, RandomDelay(lambda rng: rng.expovariate(1 / 3)))}
+    network = Network({sink, sensing_1, sensing_2}, links)
+    maximum_time = 365*24*60*60
+    simulation = Simulation(network, 'etx', 8)
+    simulation.run(maximum_time, tolerance=0.05)
+    assert simulation.env.now < maximum_time
+    assert set(simulation.dmr_half_widths) == {'1', '2'}
+    assert all(half_width <= 0.05 for half_width in simulation.dmr_half_widths.values())
+    report = simulation.report()
+    sensed = (simulation.env.now - simulation.warm_up_time) / (5*60)
+    assert report['2'].deliveries <= sensed + 1
+
+
+def test_3():
+    """A node that never misses the deadline still needs enough deliveries to bound its DMR."""
+    assert batch_means_half_width(np.zeros(100), 0.95) == 0
+    # The upper limit of the Wilson interval without misses is z**2 / (n + z**2)
+    assert abs(2 * wilson_half_width(np.zeros(100), 0.95) - 1.96 ** 2 / (100 + 1.96 ** 2)) < 1e-4
+    sink = SinkNode('0', name='sink')
+    sensing = SensingNode('1', sensing_period=60, sensing_offset=60)
+    network = Network({sink, sensing}, {Link(sink, sensing, RandomDelay(lambda rng: rng.expovariate(2)))})
+    simulation = Simulation(network, 'etx', 8)
+    simulation.run(365*24*60*60, tolerance=0.01)
+    report = simulation.report()
+    assert report['1'].dmr == 0
+    # Without misses the Wilson half-width is below 0.01 only from about 188 deliveries
+    assert report['1'].deliveries >= 1.96 ** 2 / 0.02 - 1.96 ** 2
+    assert simulation.dmr_half_widths['1'] <= 0.01
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,101 @@
+"""Test of the parameter sweeps and their cache."""
+
+import tempfile
+from functools import partial
+from random import expovariate
+from typing import Optional, Callable
+
+from wsnsim import SinkNode, SensingNode, Link, Network, RandomDelay, BatchDelay, run_sweep
+from wsnsim.routing import ETX, DAPRouting, DAPRoutingSink
+from wsnsim.sweep import network_fingerprint, configuration_key
+
+
+def create_network() -> Network:
+    """Line of three nodes with random delays."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1', sensing_period=10*60, sensing_offset=60)
+    sensing_2 = SensingNode('2', sensing_period=10*60, sensing_offset=120)
+    links = {Link(sink, sensing_1, lambda: expovariate(1 / 2)),
+             Link(sensing_1, sensing_2, lambda: expovariate(1 / 3))}
+    return Network({sink, sensing_1, sensing_2}, links)
+
+
+def test_1():
+    """Only the points missing in the cache are simulated, and the tunables are restored."""
+    network = create_network()
+    parameters = {'routing_protocol': ['min-hop', 'etx'], 'deadline': [6], 'probe_packet_rate': [1, 4]}
+    with tempfile.TemporaryDirectory() as cache_directory:
+        first = run_sweep(network, parameters, 24*60*60, cache_directory, seeds=(1, 2), workers=2)
+        assert len(first) == 8 and not any(result.cached for result in first)
+        assert ETX.probe_packet_rate == 1
+        assert all(node.sensing_period == 10*60 for node in network.nodes if isinstance(node, SensingNode))
+        # The probe rate changes the ETX results but not the min-hop ones
+        assert first[0].reports['2'].as_dict() == first[2].reports['2'].as_dict()
+        assert first[4].reports['2'].as_dict() != first[6].reports['2'].as_dict()
+        parameters['deadline'] = [6, 10]
+        second = run_sweep(create_network(), parameters, 24*60*60, cache_directory, seeds=(1, 2), workers=1)
+        assert len(second) == 16
+        assert [result.cached for result in second] == [result.point['deadline'] == 6 for result in second]
+        third = run_sweep(create_network(), parameters, 24*60*60, cache_directory, seeds=(1, 2, 3))
+        assert [result.cached for result in third] == [result.seed_value != 3 for result in third]
+        for result in second:
+            cached = next(r for r in third if r.key == result.key)
+            assert {a: r.as_dict() for a, r in cached.reports.items()} == \
+                   {a: r.as_dict() for a, r in result.reports.items()}
+
+
+def create_delay_source_network(mean_delay: float = 2, delay_source: Optional[Callable] = None) -> Network:
+    """Line of three nodes whose links use delay sources with their own stream."""
+    sink = SinkNode('0', name='sink')
+    sensing_1 = SensingNode('1')
+    sensing_2 = SensingNode('2')
+    if delay_source is None:
+        delay_source = BatchDelay(lambda size, rng: rng.exponential(3, size), block_size=64)
+    links = {Link(sink, sensing_1, RandomDelay(lambda rng: rng.expovariate(1 / mean_delay))),
+             Link(sensing_1, sensing_2, delay_source)}
+    return Network({sink, sensing_1, sensing_2}, links)
+
+
+def test_2():
+    """The fingerprint of the delay sources does not depend on the objects, only on what they compute."""
+    assert network_fingerprint(create_delay_source_network()) == network_fingerprint(create_delay_source_network())
+    assert network_fingerprint(create_delay_source_network()) != network_fingerprint(create_delay_source_network(3))
+    assert network_fingerprint(create_delay_source_network(delay_source=partial(expovariate, 0.5))) != \
+        network_fingerprint(create_delay_source_network(delay_source=partial(expovariate, 0.25)))
+
+    class Delay:
+        """Callable object, its representation has a memory address."""
+        def __call__(self) -> float:
+            return 1.0
+
+    try:
+        network_fingerprint(create_delay_source_network(delay_source=Delay()))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('A callable object was fingerprinted')
+
+
+def test_3():
+    """The tunables that are not swept change the key, and the swept ones are restored as inherited."""
+    point = {'routing_protocol': 'dap', 'deadline': 10}
+    key = configuration_key(point, 1, 60*60, 'network', (0.5,))
+    for owner, name, value in ((ETX, 'etx_share_period', 30*60), (DAPRouting, 'dap_encoding', 'uint16'),
+                               (DAPRoutingSink, 'dap_share_period', 10*60)):
+        setattr(owner, name, value)
+        try:
+            assert configuration_key(point, 1, 60*60, 'network', (0.5,)) != key
+        finally:
+            delattr(owner, name)
+        assert configuration_key(point, 1, 60*60, 'network', (0.5,)) == key
+    parameters = {'routing_protocol': ['dap'], 'deadline': [10], 'dap_share_period': [30*60]}
+    with tempfile.TemporaryDirectory() as cache_directory:
+        run_sweep(create_network(), parameters, 2*60*60, cache_directory, workers=1)
+    assert 'dap_share_period' not in vars(DAPRouting) and 'dap_share_period' not in vars(DAPRoutingSink)
+    assert DAPRouting.dap_share_period == DAPRoutingSink.dap_share_period == 60*60
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
+    test_3()
@@ -0,0 +1,51 @@
+"""Test of the time grid shared by the delay pdfs and DAPs."""
+
+import pickle
+from bisect import bisect_left
+from random import Random
+
+from wsnsim import TimeGrid
+from wsnsim.routing.dap import DAP, DelayPDF, convolution_of_dap_with_delay_pdf
+
+
+def test_1():
+    """The arithmetic lookup and the non-uniform convolution agree with the general ones."""
+    generator = Random(14)
+    for resolution, duration in ((1, 30), (0.1, 5), (0.25, 60)):
+        grid = TimeGrid.uniform(resolution, duration)
+        edges = list(grid.edges)
+        samples = [generator.uniform(-1, 1.2 * duration) for _ in range(1000)] + edges
+        assert all(grid.index(sample) == bisect_left(edges, sample) for sample in samples)
+        # Same edges, but without the resolution, so the general convolution is used
+        general_grid = TimeGrid(edges[:-1])
+        assert general_grid == grid and general_grid.resolution is None
+        delay_pdf = DelayPDF(grid)
+        general_delay_pdf = DelayPDF(general_grid)
+        for _ in range(200):
+            sample = generator.expovariate(1 / generator.uniform(0.1, duration))
+            delay_pdf.update_with_new_sample(sample)
+            general_delay_pdf.update_with_new_sample(sample)
+        dap_vector = sorted(generator.random() for _ in range(len(grid)))
+        expected = convolution_of_dap_with_delay_pdf(DAP(dap_vector, grid=grid), delay_pdf).dap_vector
+        obtained = convolution_of_dap_with_delay_pdf(DAP(dap_vector, grid=general_grid), general_delay_pdf).dap_vector
+        assert all(abs(value - expected_value) < 1e-12 for value, expected_value in zip(obtained, expected))
+
+
+def test_2():
+    """A grid cannot be changed and keeps its duration when it is pickled."""
+    grid = TimeGrid.uniform(0.3, 10)
+    for name, value in (('duration', 20), ('resolution', 1), ('edges', (1.0,))):
+        try:
+            setattr(grid, name, value)
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError(f'{name} was changed')
+    copy = pickle.loads(pickle.dumps(grid))
+    assert copy == grid
+    assert (copy.resolution, copy.duration) == (grid.resolution, grid.duration) == (0.3, 10)
+
+
+if __name__ == '__main__':
+    test_1()
+    test_2()
@@ -0,0 +1,47 @@
+"""Test of a trace streamed to disk and read back."""
+
+import os
+from tempfile import TemporaryDirectory
+
+from wsnsim import SinkNode, SensingNode, Link, Network, Simulation, Retention, TraceSink, read_trace, \
+    read_trace_addresses
+from wsnsim.packet import PacketKind, BROADCAST
+from wsnsim.recorder import EventType, LOG_NAMES, BROADCAST_ID, known_addresses, address_from_id
+
+
+def test_1():
+    """
+    Topology:
+
+      (5)
+     0 - 1
+
+    """
+    sink = SinkNode('0', name='sink')
+    sensing = SensingNode('1')
+    network = Network({sink, sensing}, {Link(sink, sensing, lambda: 5)})
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trace.bin')
+        # Nothing is kept in memory, every event goes to the file in small chunks
+        log_retention = {name: Retention.off() for name in LOG_NAMES}
+        with TraceSink(path, chunk_records=16) as trace_sink:
+            simulation = Simulation(network, 'min-hop', 20, log_retention=log_retention, trace_sink=trace_sink)
+            simulation.run(24*60*60)
+        columns = read_trace(path)
+        addresses = read_trace_addresses(path)
+        assert len(columns['timestamp']) == trace_sink.total
+        # 24 measurements reached the sink, each with a delay of 5 seconds
+        received_by_sink = ((columns['event'] == EventType.RECEIVED) & (columns['kind'] == PacketKind.DATA)
+                            & (columns['node'] == [i for i, address in addresses.items() if address == '0'][0]))
+        assert received_by_sink.sum() == 24
+        assert set((columns['timestamp'] - columns['created'])[received_by_sink]) == {5}
+        # The hello broadcasts use the reserved id, the broadcast address is never registered
+        transmitted_hellos = (columns['event'] == EventType.TRANSMITTED) & (columns['kind'] == PacketKind.HELLO)
+        assert transmitted_hellos.any() and set(columns['peer'][transmitted_hellos]) == {BROADCAST_ID}
+        assert addresses[BROADCAST_ID] == address_from_id(BROADCAST_ID) == BROADCAST
+        assert BROADCAST not in known_addresses()
+        del columns  # Releases the memory-mapped file
+
+
+if __name__ == '__main__':
+    test_1()
@@ -3,4 +3,13 @@
 from .simulation import Simulation
 from .network import Network
 from .node import SinkNode, SensingNode
-from .link import Link
+from .link import Link, BatchDelay, RandomDelay
+from .link_estimator import LinkEstimator
+from .recorder import Retention
+from .time_grid import TimeGrid
+from .tracing import Tracer, TraceLevel
+from .trace_file import TraceSink, read_trace, read_trace_addresses
+from .performance import NodeReport, plot_report
+from .replications import run_replications, ReplicatedNodeReport
+from .sweep import run_sweep, SweepResult
+from .analytic import analytic_report
@@ -0,0 +1,169 @@
+"""Analytic evaluation of the DMR, without discrete-event simulation.
+
+With static routes and without queueing, the end-to-end delay of a node is
+the sum of the delays of the links of its route. Its cumulative distribution
+(a DAP) is the convolution of the distribution of the next hop with the
+delay pdf of the link, see convolution_of_dap_with_delay_pdf(). When a node
+has several best next hops the simulation picks one at random for every
+packet, so the distribution is the mean of the ones through each of them.
+
+The routing policy is 'min-hop', 'etx', 'dap' (the next hops with maximum
+DAP for the whole deadline, fixed along the route) or the next hop of every
+sensing node. With 'dap' the result is an approximation: the protocol judges
+every hop against the time remaining to the packet, so a late packet may
+take another next hop than the one kept here. The DMR stays close to the
+simulated one, the delay distribution less so.
+
+The link delay pdfs are estimated from samples of the delay functions, on a
+uniform grid whose resolution sets the accuracy: every delay is rounded up
+to the next edge.
+"""
+
+from statistics import mean
+from typing import Dict, List, Iterable, Optional, Union
+
+import numpy as np
+
+from .convergence import (DEFAULT_SAMPLES_PER_LINK, DelaySamples, seed_delay_sources, sample_link_delays,
+                          find_sink_address, converged_hop_counts, converged_etx, converged_daps)
+from .network import Network
+from .node import SensingNode
+from .performance import NodeReport, DEFAULT_QUANTILES
+from .routing.dap import DAP, DelayPDF, convolution_of_dap_with_delay_pdf
+from .simulation import DEFAULT_SEED
+from .time_grid import TimeGrid
+
+DEFAULT_GRID_POINTS = 1000  # Bins of the default grid, up to four times the deadline
+
+RoutingPolicy = Union[str, Dict[str, str]]
+
+
+def analytic_report(network: Network, routing_policy: RoutingPolicy, deadline: float,
+                    grid: Optional[TimeGrid] = None,
+                    samples_per_link: int = DEFAULT_SAMPLES_PER_LINK,
+                    seed_value: int = DEFAULT_SEED,
+                    quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, NodeReport]:
+    """Returns the performance of every sensing node with a route to the sink, as Simulation.report().
+
+    The histograms hold probabilities instead of counts, with one delivery,
+    and the delays beyond the grid are counted in its last bin. With 'dap'
+    the next hops are chosen once for the whole deadline, see the module
+    docstring.
+    """
+    if grid is None:
+        duration = 4 * deadline
+        grid = TimeGrid.uniform(duration / DEFAULT_GRID_POINTS, duration)
+    if grid.resolution is None:
+        raise ValueError('The analytic evaluation needs a uniform grid')
+    seed_delay_sources(network, seed_value)
+    delay_samples = sample_link_delays(network, samples_per_link)
+    next_hops = _next_hops(network, routing_policy, deadline, delay_samples, grid)
+    link_delay_pdfs = {(address, next_hop): _delay_pdf(delay_samples[address][next_hop], grid)
+                       for address, hops in next_hops.items() for next_hop in hops}
+    sink_address = find_sink_address(network)
+    delay_distributions = {sink_address: DAP(sink=True, grid=grid)}
+    quantiles = tuple(quantiles)
+    reports = {}
+    for node in network.nodes:
+        if isinstance(node, SensingNode) and node.address in next_hops:
+            distribution = _delay_distribution(node.address, next_hops, link_delay_pdfs, delay_distributions, [])
+            reports[node.address] = _report_from_distribution(node.address, distribution, deadline, quantiles)
+    return reports
+
+
+def _next_hops(network: Network, routing_policy: RoutingPolicy, deadline: float,
+               delay_samples: DelaySamples, grid: TimeGrid) -> Dict[str, List[str]]:
+    """Returns the next hops of every sensing node with a route to the sink."""
+    sink_address = find_sink_address(network)
+    if isinstance(routing_policy, dict):
+        return {address: [next_hop] for address, next_hop in routing_policy.items() if address != sink_address}
+    if routing_policy == 'min-hop':
+        metrics = {address: float(hop_count) for address, hop_count in converged_hop_counts(network).items()}
+        return _best_next_hops(metrics, delay_samples, sink_address, lambda address, neighbour: metrics[neighbour])
+    if routing_policy == 'etx':
+        metrics = converged_etx(network, delay_samples)
+
+        def total_etx(address: str, neighbour: str) -> float:
+            """Returns the ETX through a neighbour."""
+            return metrics[neighbour] + mean(delay_samples[address][neighbour])
+
+        return _best_next_hops(metrics, delay_samples, sink_address, total_etx)
+    if routing_policy == 'dap':
+        daps = converged_daps(network, delay_samples, grid)
+
+        def missed_deadline(address: str, neighbour: str) -> float:
+            """Returns the probability to miss the deadline through a neighbour."""
+            delay_pdf = _delay_pdf(delay_samples[address][neighbour], grid)
+            return 1 - convolution_of_dap_with_delay_pdf(daps[neighbour], delay_pdf).get_dap(deadline)
+
+        return _best_next_hops(daps, delay_samples, sink_address, missed_deadline)
+    raise ValueError(f"{routing_policy} is not a valid routing policy")
+
+
+def _delay_pdf(samples: Iterable[float], grid: TimeGrid) -> DelayPDF:
+    """Returns the delay pdf of a link estimated from samples."""
+    delay_pdf = DelayPDF(grid)
+    for sample in samples:
+        delay_pdf.update_with_new_sample(sample)
+    return delay_pdf
+
+
+def _best_next_hops(reachable: Dict[str, object], delay_samples: DelaySamples, sink_address: str,
+                    metric) -> Dict[str, List[str]]:
+    """Returns the neighbours with minimum metric of every node with a path to the sink."""
+    next_hops = {}
+    for address in reachable:
+        if address == sink_address:
+            continue
+        metrics = {neighbour: metric(address, neighbour) for neighbour in delay_samples[address]}
+        min_metric = min(metrics.values())
+        next_hops[address] = [neighbour for neighbour, value in metrics.items() if value <= min_metric]
+    return next_hops
+
+
+def _delay_distribution(address: str, next_hops: Dict[str, List[str]], link_delay_pdfs: Dict,
+                        delay_distributions: Dict[str, DAP], route: List[str]) -> DAP:
+    """Returns the cumulative distribution of the end-to-end delay of a node, keeping the ones computed."""
+    if address in delay_distributions:
+        return delay_distributions[address]
+    if address in route:
+        raise ValueError(f'The route of node {route[0]} has a loop through node {address}')
+    if address not in next_hops:
+        raise ValueError(f'Node {address} has no route to the sink')
+    route.append(address)
+    through_next_hops = [
+        convolution_of_dap_with_delay_pdf(
+            _delay_distribution(next_hop, next_hops, link_delay_pdfs, delay_distributions, route),
+            link_delay_pdfs[address, next_hop]).dap_vector
+        for next_hop in next_hops[address]]
+    route.pop()
+    grid = link_delay_pdfs[address, next_hops[address][0]].grid
+    distribution = DAP(np.mean(through_next_hops, axis=0).tolist(), grid=grid)
+    delay_distributions[address] = distribution
+    return distribution
+
+
+def _report_from_distribution(address: str, distribution: DAP, deadline: float,
+                              quantiles: tuple) -> NodeReport:
+    """Returns the report of a node from the cumulative distribution of its delay."""
+    grid = distribution.grid
+    cumulative = np.asarray(distribution.dap_vector)
+    probabilities = np.diff(cumulative, prepend=0.0)
+    # The delays beyond the grid are counted at its end
+    delays = np.array(grid.edges[:-1] + (grid.duration,))
+    mean_delay = float(np.dot(probabilities, delays))
+    standard_deviation = float(np.sqrt(max(np.dot(probabilities, (delays - mean_delay) ** 2), 0.0)))
+    quantile_values = {q: float(delays[min(np.searchsorted(cumulative, q - 1e-12), len(delays) - 1)])
+                       for q in quantiles}
+    # Bin i of the histogram is (edge i, edge i + 1], the delays of 0 are in the first one
+    counts = probabilities[1:].copy()
+    counts[0] += probabilities[0]
+    edges = np.arange(len(counts) + 1) * grid.resolution
+    return NodeReport(address,
+                      1,
+                      1 - distribution.get_dap(deadline),
+                      mean_delay,
+                      standard_deviation,
+                      quantile_values,
+                      counts,
+                      edges)
@@ -1,4 +1,5 @@
 """Some functions that are useful in other files."""
+from bisect import bisect_left
 from decimal import Decimal
 from typing import Callable, Iterable
 
@@ -33,27 +34,6 @@ def ensure_positive_value(function: Callable[..., float]) \
     return inner
 
 
-def get_components_of_message(data: str) -> Iterable[str]:
-    """Returns the three components (origin, destination, message) of a data packet."""
-    data_list = data.split(',')
-    origin, destination, message = data_list
-    return origin, destination, message
-
-
-def is_hello_message(message: str) -> bool:
-    """Checks if a message is a hello message."""
-    if "Hello" in message:
-        return True
-    return False
-
-
-def parse_payload(payload: str) -> Iterable[str]:
-    """Parses the payload and returns the three components."""
-    payload_components = payload.split('/')
-    source, measurement, measurement_time = payload_components
-    return source, measurement, float(measurement_time)
-
-
 def float_range(start: float, stop: float, step: float) -> Iterable:
     """Float alternative for range()"""
     while start < stop:
@@ -61,34 +41,10 @@ def float_range(start: float, stop: float, step: float) -> Iterable:
         start += Decimal(step)
 
 
-def is_etx_message(message: str) -> bool:
-    """Checks if a message contains information about some neighbour ETX."""
-    if "ETX" in message:
-        return True
-    return False
-
-
-def divide_vector(vector: list, number: float) -> list:
-    """Divides a vector."""
-    divided_vector = [value / number for value in vector]
-    return divided_vector
-
-
-def multiply_vector(vector: list, number: float) -> list:
-    """Multiply a vector."""
-    multiplied_vector = [value * number for value in vector]
-    return multiplied_vector
-
-
 def find_index_of_delay(sample: float, delay_vector: list) -> int:
-    """Returns the corresponding index for a new sample of the delay pdf."""
-    for index, delay_value in enumerate(delay_vector):
-        if sample <= delay_value:
-            return index
-
+    """Returns the corresponding index for a new sample of the delay pdf.
 
-def is_dap_message(message: str) -> bool:
-    """Checks if a message contains information about some neighbour DAP."""
-    if "DAP" in message:
-        return True
-    return False
+    It is the first index whose delay is greater or equal than the sample,
+    found with a binary search since the delay vector is sorted.
+    """
+    return bisect_left(delay_vector, sample)
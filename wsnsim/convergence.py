@@ -0,0 +1,184 @@
+"""Offline solver of the converged state of the routing protocols.
+
+Instead of waiting for the Hello floods, the probes and the periodic sharing
+of ETXs and DAPs, the routes toward the sink are computed from the topology
+and from samples of the delay of every link:
+
+- min-hop: breadth-first search from the sink.
+- ETX: shortest path with the mean delay of every link as weight.
+- DAP: value iteration with convolution_of_dap_with_delay_pdf().
+
+warm_start() injects that state into the neighbours of every node, so a
+simulation starts in steady state. Nodes without a path to the sink are left
+as they are.
+"""
+
+from collections import deque
+from heapq import heappush, heappop
+from random import seed
+from statistics import mean
+from typing import Dict, List, Iterable, Optional
+
+import numpy as np
+
+from .network import Network
+from .node import SinkNode
+from .random_streams import stream_seed, integer_seed
+from .routing.dap import DAP, DelayPDF, convolution_of_dap_with_delay_pdf
+from .time_grid import TimeGrid, DEFAULT_TIME_GRID
+
+DEFAULT_SAMPLES_PER_LINK = 1000
+WARM_START_STREAM = 'warm-start'  # Kind of the streams of the warm start samples
+
+# Delay samples of the link between every pair of neighbours, both directions share them
+DelaySamples = Dict[str, Dict[str, List[float]]]
+
+
+def find_sink_address(network: Network) -> str:
+    """Returns the address of the sink node of a network."""
+    for node in network.nodes:
+        if isinstance(node, SinkNode):
+            return node.address
+    raise ValueError('There is no sink node in the network')
+
+
+def neighbour_addresses(network: Network) -> Dict[str, List[str]]:
+    """Returns the addresses of the neighbours of every node."""
+    neighbours = {node.address: [] for node in network.nodes}
+    for link in network.links:
+        node_1, node_2 = (node.address for node in link.nodes)
+        neighbours[node_1].append(node_2)
+        neighbours[node_2].append(node_1)
+    return neighbours
+
+
+def seed_delay_sources(network: Network, seed_value: int, kind: str = 'link') -> None:
+    """Restarts the global random module and the batch and random delay sources of the links.
+
+    The 'link' streams are the ones of Simulation.run(), another 'kind' gives
+    independent ones for the same seed.
+    """
+    if kind == 'link':
+        seed(seed_value)
+    else:
+        seed(integer_seed(stream_seed(seed_value, kind)))
+    for link in network.links:
+        link.seed_delay_source(seed_value, kind)
+
+
+def sample_link_delays(network: Network, samples_per_link: int = DEFAULT_SAMPLES_PER_LINK) -> DelaySamples:
+    """Returns samples of the delay of every link, from its delay function."""
+    delay_samples = {node.address: {} for node in network.nodes}
+    for link in network.links:
+        node_1, node_2 = (node.address for node in link.nodes)
+        samples = [link.get_delay() for _ in range(samples_per_link)]
+        delay_samples[node_1][node_2] = samples
+        delay_samples[node_2][node_1] = samples
+    return delay_samples
+
+
+def converged_hop_counts(network: Network) -> Dict[str, int]:
+    """Returns the min-hop count to the sink of every node with a path to it."""
+    neighbours = neighbour_addresses(network)
+    sink_address = find_sink_address(network)
+    hop_counts = {sink_address: 0}
+    queue = deque([sink_address])
+    while queue:
+        address = queue.popleft()
+        for neighbour in neighbours[address]:
+            if neighbour not in hop_counts:
+                hop_counts[neighbour] = hop_counts[address] + 1
+                queue.append(neighbour)
+    return hop_counts
+
+
+def converged_etx(network: Network, delay_samples: DelaySamples) -> Dict[str, float]:
+    """Returns the minimum sum of mean link delays to the sink of every node with a path to it."""
+    sink_address = find_sink_address(network)
+    etx = {}
+    heap = [(0.0, sink_address)]
+    while heap:
+        node_etx, address = heappop(heap)
+        if address in etx:
+            continue
+        etx[address] = node_etx
+        for neighbour, samples in delay_samples[address].items():
+            if neighbour not in etx:
+                heappush(heap, (node_etx + mean(samples), neighbour))
+    return etx
+
+
+def converged_daps(network: Network, delay_samples: DelaySamples,
+                   grid: TimeGrid = DEFAULT_TIME_GRID) -> Dict[str, DAP]:
+    """Returns the maximum DAP toward the sink of every node with a path to it.
+
+    Going around a cycle never increases a DAP, so the iterations stop after
+    as many rounds as nodes, or before if no DAP changes.
+    """
+    sink_address = find_sink_address(network)
+    link_delay_pdfs = {}
+    for address, neighbours in delay_samples.items():
+        for neighbour, samples in neighbours.items():
+            delay_pdf = DelayPDF(grid)
+            for sample in samples:
+                delay_pdf.update_with_new_sample(sample)
+            link_delay_pdfs[address, neighbour] = delay_pdf
+    daps = {address: np.zeros(len(grid)) for address in delay_samples}
+    daps[sink_address] = np.ones(len(grid))
+    for _ in range(len(daps)):
+        new_daps = {sink_address: daps[sink_address]}
+        for address, neighbours in delay_samples.items():
+            if address == sink_address or not neighbours:
+                continue
+            daps_through_neighbours = [
+                convolution_of_dap_with_delay_pdf(DAP(daps[neighbour].tolist(), grid=grid),
+                                                  link_delay_pdfs[address, neighbour]).dap_vector
+                for neighbour in neighbours]
+            new_daps[address] = np.max(daps_through_neighbours, axis=0)
+        changed = any(not np.array_equal(new_daps.get(address, dap), dap) for address, dap in daps.items())
+        daps.update(new_daps)
+        if not changed:
+            break
+    return {address: DAP(dap.tolist(), grid=grid) for address, dap in daps.items() if dap[-1] > 0}
+
+
+def warm_start(network: Network, routing_protocol: str,
+               samples_per_link: int = DEFAULT_SAMPLES_PER_LINK,
+               seed_value: Optional[int] = None,
+               grid: TimeGrid = DEFAULT_TIME_GRID) -> None:
+    """Injects the converged routing state into the nodes of a simulation network.
+
+    The delay samples are drawn with the global random module and the batch
+    and random delay sources of the links. With a 'seed_value' they are
+    restarted on streams of their own, so a simulation run with the same seed
+    does not replay the delays the converged state was computed from.
+    """
+    if seed_value is not None:
+        seed_delay_sources(network, seed_value, WARM_START_STREAM)
+    if routing_protocol == 'min-hop':
+        hop_counts = converged_hop_counts(network)
+        neighbours = neighbour_addresses(network)
+        for node in _reachable_nodes(network, hop_counts):
+            node.routing_protocol.warm_start({neighbour: hop_counts[neighbour]
+                                              for neighbour in neighbours[node.address]})
+        return
+    delay_samples = sample_link_delays(network, samples_per_link)
+    if routing_protocol == 'etx':
+        etx = converged_etx(network, delay_samples)
+        for node in _reachable_nodes(network, etx):
+            link_delays = delay_samples[node.address]
+            node.routing_protocol.warm_start({neighbour: etx[neighbour] for neighbour in link_delays},
+                                             link_delays)
+    elif routing_protocol == 'dap':
+        daps = converged_daps(network, delay_samples, grid)
+        for node in _reachable_nodes(network, daps):
+            link_delays = delay_samples[node.address]
+            node.routing_protocol.warm_start({neighbour: daps[neighbour].dap_vector for neighbour in link_delays},
+                                             link_delays)
+    else:
+        raise ValueError(f"{routing_protocol} is not a valid protocol")
+
+
+def _reachable_nodes(network: Network, converged_state: Dict[str, object]) -> Iterable:
+    """Returns the nodes with a path to the sink."""
+    return [node for node in network.nodes if node.address in converged_state]
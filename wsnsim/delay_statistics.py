@@ -0,0 +1,168 @@
+"""Streaming statistics of the end-to-end delay, updated as packets arrive.
+
+Every structure uses O(1) memory per source node (the sketch grows with the
+logarithm of the delay range), and can be merged with another one of the
+same configuration, e.g. to combine replications.
+"""
+
+from math import ceil, log, sqrt, inf
+from typing import Dict, List, Optional
+
+DEFAULT_BIN_WIDTH = 1.0  # In seconds
+DEFAULT_NUMBER_OF_BINS = 120
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_SKETCH_VALUE = 1e-9  # Smaller delays are counted as zero by the sketch
+
+
+class DelayHistogram:
+    """Histogram with fixed bins, the last bin counts every larger delay."""
+
+    def __init__(self, bin_width: float = DEFAULT_BIN_WIDTH, number_of_bins: int = DEFAULT_NUMBER_OF_BINS) -> None:
+        self.bin_width = bin_width
+        self.counts = [0] * (number_of_bins + 1)
+
+    def update(self, delay: float) -> None:
+        """Counts a new delay."""
+        index = int(delay / self.bin_width)
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+
+    def edges(self) -> List[float]:
+        """Returns the edges of the bins, the last one is infinite."""
+        return [index * self.bin_width for index in range(len(self.counts))] + [inf]
+
+    def merge(self, other: 'DelayHistogram') -> None:
+        """Adds the counts of another histogram with the same bins."""
+        if other.bin_width != self.bin_width or len(other.counts) != len(self.counts):
+            raise ValueError('Histograms with different bins cannot be merged')
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy (DDSketch).
+
+    Every delay is counted in a bucket whose limits grow geometrically, so
+    any quantile is returned with a relative error below 'relative_accuracy'.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('The relative accuracy must be between 0 and 1')
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        """Counts a new value."""
+        self.count += 1
+        if value <= MIN_SKETCH_VALUE:
+            self._zero_count += 1
+            return
+        index = ceil(log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns an estimation of the q-quantile (0 <= q <= 1)."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        accumulated = self._zero_count
+        if rank < accumulated:
+            return 0.0
+        for index in sorted(self._buckets):
+            accumulated += self._buckets[index]
+            if rank < accumulated:
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Adds the values counted by another sketch with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Sketches with different accuracy cannot be merged')
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+
+
+class DelayStatistics:
+    """End-to-end delay statistics of one source node."""
+
+    def __init__(self, deadline: Optional[float],
+                 bin_width: float = DEFAULT_BIN_WIDTH,
+                 number_of_bins: int = DEFAULT_NUMBER_OF_BINS,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> None:
+        self.deadline = deadline
+        self.count = 0
+        self.deadline_misses = 0
+        self.mean = 0.0
+        self._sum_of_squares = 0.0  # Of the differences from the mean (Welford)
+        self.minimum = inf
+        self.maximum = -inf
+        self.histogram = DelayHistogram(bin_width, number_of_bins)
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def update(self, delay: float) -> None:
+        """Updates the statistics with a new delay."""
+        self.count += 1
+        if self.deadline is not None and delay > self.deadline:
+            self.deadline_misses += 1
+        difference = delay - self.mean
+        self.mean += difference / self.count
+        self._sum_of_squares += difference * (delay - self.mean)
+        if delay < self.minimum:
+            self.minimum = delay
+        if delay > self.maximum:
+            self.maximum = delay
+        self.histogram.update(delay)
+        self.sketch.update(delay)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the delay."""
+        if self.count < 2:
+            return 0.0
+        return self._sum_of_squares / (self.count - 1)
+
+    @property
+    def standard_deviation(self) -> float:
+        """Sample standard deviation of the delay."""
+        return sqrt(self.variance)
+
+    @property
+    def dmr(self) -> Optional[float]:
+        """Deadline miss ratio."""
+        if self.count == 0 or self.deadline is None:
+            return None
+        return self.deadline_misses / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns an estimation of the q-quantile of the delay."""
+        return self.sketch.quantile(q)
+
+    def merge(self, other: 'DelayStatistics') -> None:
+        """Adds the delays counted by other statistics of the same configuration."""
+        if other.deadline != self.deadline:
+            raise ValueError('Statistics with different deadlines cannot be merged')
+        count = self.count + other.count
+        if count == 0:
+            return
+        difference = other.mean - self.mean
+        self._sum_of_squares += other._sum_of_squares + difference ** 2 * self.count * other.count / count
+        self.mean += difference * other.count / count
+        self.count = count
+        self.deadline_misses += other.deadline_misses
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+
+    def __repr__(self):
+        return f'(Count: {self.count}, DMR: {self.dmr}, Mean: {self.mean}, ' \
+               f'Standard deviation: {self.standard_deviation})'
+
+    __str__ = __repr__
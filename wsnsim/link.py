@@ -1,39 +1,132 @@
 """Everything related with the simulation of a link."""
 
-from typing import Callable, Iterable
+from random import Random
+from typing import Callable, Iterable, Union, Optional
+
+import numpy as np
 
 from .auxiliary_functions import ensure_positive_value
 from .node import Node, SimulationNode, get_equivalent_simulation_node
+from .random_streams import stream_seed, python_random
+
+DEFAULT_BLOCK_SIZE = 4096  # Samples drawn at once by a BatchDelay
+
+
+class BatchDelay:
+    """Delay source that draws blocks of samples and serves them one by one.
+
+    The sampler receives the block size and a NumPy random generator, and
+    must return that many delay samples, e.g.:
+    BatchDelay(lambda size, rng: gamma.rvs(10, scale=4, size=size, random_state=rng))
+    """
+
+    def __init__(self, sampler: Callable[[int, np.random.Generator], Iterable[float]],
+                 block_size: int = DEFAULT_BLOCK_SIZE, seed: Optional[int] = None) -> None:
+        if block_size < 1:
+            raise ValueError('Block size must be at least 1')
+        self._sampler = sampler
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        self._buffer = []
+        self._index = 0
+
+    def reseed(self, seed) -> None:
+        """Restarts the random sequence and discards the buffered samples."""
+        self._rng = np.random.default_rng(seed)
+        self._buffer = []
+        self._index = 0
+
+    def __call__(self) -> float:
+        """Returns the next delay sample, drawing a new block if needed."""
+        if self._index == len(self._buffer):
+            self._refill()
+        value = self._buffer[self._index]
+        self._index += 1
+        return value
+
+    def _refill(self) -> None:
+        """Draws a new block of samples and checks all of them at once."""
+        block = np.asarray(self._sampler(self.block_size, self._rng), dtype=float)
+        if block.shape != (self.block_size,):
+            raise ValueError(f'Sampler returned {block.shape} samples instead of {self.block_size}')
+        if np.any(block < 0):
+            raise ValueError('Value obtained is negative')
+        # Python floats are faster to serve one by one than NumPy scalars
+        self._buffer = block.tolist()
+        self._index = 0
+
+
+class RandomDelay:
+    """Delay source with its own random stream, independent of the other links.
+
+    The sampler receives a Python random generator, e.g.:
+    RandomDelay(lambda rng: rng.expovariate(1 / 5))
+    """
+
+    def __init__(self, sampler: Callable[[Random], float], seed: Optional[int] = None) -> None:
+        self._sampler = sampler
+        self._random = Random(seed)
+
+    def reseed(self, seed_sequence: np.random.SeedSequence) -> None:
+        """Restarts the random sequence."""
+        self._random = python_random(seed_sequence)
+
+    def __call__(self) -> float:
+        """Returns the next delay sample."""
+        return self._sampler(self._random)
+
+
+DelayFunction = Union[Callable[[], float], BatchDelay, RandomDelay]
 
 
 class Link:
     """Relates two nodes in a physical medium."""
 
-    def __init__(self, node_1: Node, node_2: Node, delay_function: Callable[[], float]) -> None:
+    def __init__(self, node_1: Node, node_2: Node, delay_function: DelayFunction) -> None:
         self.nodes = sorted([node_1, node_2], key=lambda node: node.address)
         self._delay_function = delay_function
 
-    @ensure_positive_value
     def get_delay(self) -> float:
         """Returns a realization of delay value of the link."""
+        if isinstance(self._delay_function, BatchDelay):
+            # The samples of a batch source are checked once per block
+            return self._delay_function()
+        return self._get_single_delay()
+
+    @ensure_positive_value
+    def _get_single_delay(self) -> float:
+        """Returns a realization from a delay function without batches."""
         return self._delay_function()
 
+    def seed_delay_source(self, seed_value: int, kind: str = 'link') -> None:
+        """Restarts the random sequence of a batch or random delay source.
+
+        The seed depends on the node addresses and not on the order of the
+        links, so every link gets the same sequence in every run. Another
+        'kind' of stream gives an independent sequence for the same seed.
+        Delay functions that use the global random module share its stream.
+        """
+        if isinstance(self._delay_function, (BatchDelay, RandomDelay)):
+            addresses = (node.address for node in self.nodes)
+            self._delay_function.reseed(stream_seed(seed_value, kind, *addresses))
+
 
 class SimulationLink(Link):
     """Extends Link class in order to simulate."""
 
-    def __init__(self, node_1: SimulationNode, node_2: SimulationNode, delay_function: Callable[[], float]) -> None:
+    def __init__(self, node_1: SimulationNode, node_2: SimulationNode, delay_function: DelayFunction) -> None:
         super().__init__(node_1, node_2, delay_function)
         self.nodes = sorted([node_1, node_2], key=lambda node: node.address)
         self._delay_function = delay_function
 
     def get_destination(self, origin_address: str) -> SimulationNode:
         """Returns the destination node of the link from the origin address."""
-        origin_node = [n for n in self.nodes if n.address == origin_address]
-        if len(origin_node) != 1:
-            raise Exception('Node is not part of the link.')
-        destination_node = (set(self.nodes) - set(origin_node)).pop()
-        return destination_node
+        node_1, node_2 = self.nodes
+        if node_1.address == origin_address:
+            return node_2
+        if node_2.address == origin_address:
+            return node_1
+        raise Exception('Node is not part of the link.')
 
     def __repr__(self) -> str:
         return f'{self.nodes[0].address}, {self.nodes[0].address}'
@@ -53,22 +146,3 @@ def convert_to_simulation_links(links: Iterable[Link], simulation_nodes: Iterabl
         simulation_links.append(simulation_link)
     return simulation_links
 
-
-def get_all_links_of_node(node_address: str, links: Iterable[SimulationLink]) -> Iterable[SimulationLink]:
-    """Returns all the links of a node."""
-    node_links = []
-    for link in links:
-        link_addresses = {node.address for node in link.nodes}
-        if node_address in link_addresses:
-            node_links.append(link)
-    return node_links
-
-
-def get_link_between_nodes(node1_address: str, node2_address: str, links: Iterable[SimulationLink]) -> SimulationLink:
-    """Returns the link between two nodes."""
-    for link in links:
-        link_node_addresses = {node.address for node in link.nodes}
-        if link_node_addresses == {node1_address, node2_address}:
-            return link
-    raise Exception(f"Link between node {node1_address} and "
-                    f"node {node2_address} does not exist.")
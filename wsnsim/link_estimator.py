@@ -0,0 +1,114 @@
+"""Estimators of the mean link delay used by ETX routing.
+
+Every estimator is updated in O(1) time and keeps O(1) memory: the running
+mean weights every sample the same, the EWMA and the sliding window follow
+links whose delay changes along the simulation.
+"""
+
+from collections import deque
+from typing import Optional
+
+
+class _RunningMean:
+    """Mean of every sample."""
+    __slots__ = ('value', '_count')
+
+    def __init__(self) -> None:
+        self.value: Optional[float] = None
+        self._count = 0
+
+    def update(self, sample: float) -> None:
+        """Adds a new sample to the estimation."""
+        self._count += 1
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += (sample - self.value) / self._count
+
+
+class _EWMA:
+    """Exponentially weighted moving average, the first sample is the initial value."""
+    __slots__ = ('value', '_alpha')
+
+    def __init__(self, alpha: float) -> None:
+        self.value: Optional[float] = None
+        self._alpha = alpha
+
+    def update(self, sample: float) -> None:
+        """Adds a new sample to the estimation."""
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += self._alpha * (sample - self.value)
+
+
+class _SlidingWindow:
+    """Mean of the last samples."""
+    __slots__ = ('_samples', '_sum')
+
+    def __init__(self, size: int) -> None:
+        self._samples = deque(maxlen=size)
+        self._sum = 0.0
+
+    def update(self, sample: float) -> None:
+        """Adds a new sample to the estimation."""
+        if len(self._samples) == self._samples.maxlen:
+            self._sum -= self._samples[0]
+        self._samples.append(sample)
+        self._sum += sample
+
+    @property
+    def value(self) -> Optional[float]:
+        """Returns the mean of the window, None if there are no samples."""
+        if not self._samples:
+            return None
+        return self._sum / len(self._samples)
+
+
+class LinkEstimator:
+    """How the mean delay of a link is estimated: running mean, EWMA or sliding window."""
+
+    def __init__(self, kind: str, parameter: Optional[float] = None) -> None:
+        if kind not in ('mean', 'ewma', 'window'):
+            raise ValueError(f'{kind} is not a valid link estimator')
+        if kind == 'mean' and parameter is not None:
+            raise ValueError('The running mean does not take a parameter')
+        if kind == 'ewma' and (parameter is None or not 0 < parameter <= 1):
+            raise ValueError('The alpha of an EWMA must be in (0, 1]')
+        if kind == 'window' and (parameter is None or parameter != int(parameter) or parameter < 1):
+            raise ValueError('The size of a sliding window must be a positive integer')
+        self.kind = kind
+        self.parameter = parameter
+
+    @classmethod
+    def mean(cls) -> 'LinkEstimator':
+        """Every sample has the same weight."""
+        return cls('mean')
+
+    @classmethod
+    def ewma(cls, alpha: float) -> 'LinkEstimator':
+        """Every new sample has a weight 'alpha' and the previous estimation '1 - alpha'."""
+        return cls('ewma', alpha)
+
+    @classmethod
+    def window(cls, size: int) -> 'LinkEstimator':
+        """Only the last 'size' samples are used."""
+        return cls('window', size)
+
+    def new(self):
+        """Returns an estimator without samples, with 'update(sample)' and 'value'."""
+        if self.kind == 'ewma':
+            return _EWMA(self.parameter)
+        if self.kind == 'window':
+            return _SlidingWindow(int(self.parameter))
+        return _RunningMean()
+
+    def __repr__(self):
+        if self.kind == 'mean':
+            return 'LinkEstimator.mean()'
+        return f'LinkEstimator.{self.kind}({self.parameter})'
+
+    __str__ = __repr__
+
+
+DEFAULT_LINK_ESTIMATOR = LinkEstimator.mean()
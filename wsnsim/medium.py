@@ -1,40 +1,95 @@
 """Implements the wireless medium."""
 
-from typing import Iterable, Generator, Any
+from typing import Iterable, Generator, Any, Dict, FrozenSet, Optional
 
 from simpy import Environment, Event
 
-from .auxiliary_functions import get_components_of_message
-from .link import SimulationLink, get_all_links_of_node, get_link_between_nodes
+from .link import SimulationLink
+from .packet import Packet, BROADCAST
+from .recorder import EventType, address_id
+from .trace_file import TraceSink
 
 
 class Medium:
     """Abstraction of the Physical Medium to communicate in Radio Frequency."""
 
-    def __init__(self, env: Environment) -> None:
+    def __init__(self, env: Environment, trace_sink: Optional[TraceSink] = None) -> None:
         self.env = env
-        self._links = None
+        self._trace_sink = trace_sink
+        # Adjacency index, so the links used by a packet are found, added and removed in O(1).
+        # The links of a node are keyed by the neighbour address, in the order they were added
+        self._links_of_node: Dict[str, Dict[str, SimulationLink]] = {}
+        self._link_between_nodes: Dict[FrozenSet[str], SimulationLink] = {}
 
     def setup_links(self, links: Iterable[SimulationLink]) -> None:
         """Updates the links used by the medium object."""
-        self._links = links
+        self._links_of_node = {}
+        self._link_between_nodes = {}
+        for link in links:
+            self.add_link(link)
 
-    def send_data_to_medium(self, data: str) -> Generator[Event, Any, Any]:
+    def add_link(self, link: SimulationLink) -> None:
+        """Adds a link to the medium and to the adjacency index."""
+        addresses = frozenset(node.address for node in link.nodes)
+        if addresses in self._link_between_nodes:
+            raise Exception(f'Link between nodes {link.nodes[0].address} and '
+                            f'{link.nodes[1].address} already exists.')
+        self._link_between_nodes[addresses] = link
+        node_1, node_2 = link.nodes
+        self._links_of_node.setdefault(node_1.address, {})[node_2.address] = link
+        self._links_of_node.setdefault(node_2.address, {})[node_1.address] = link
+
+    def remove_link(self, link: SimulationLink) -> None:
+        """Removes a link from the medium and from the adjacency index."""
+        addresses = frozenset(node.address for node in link.nodes)
+        if self._link_between_nodes.get(addresses) is not link:
+            raise Exception(f'Link between nodes {link.nodes[0].address} and '
+                            f'{link.nodes[1].address} does not exist.')
+        del self._link_between_nodes[addresses]
+        node_1, node_2 = link.nodes
+        del self._links_of_node[node_1.address][node_2.address]
+        del self._links_of_node[node_2.address][node_1.address]
+
+    def get_all_links_of_node(self, node_address: str) -> Iterable[SimulationLink]:
+        """Returns all the links of a node."""
+        return list(self._links_of_node.get(node_address, {}).values())
+
+    def get_link_between_nodes(self, node1_address: str, node2_address: str) -> SimulationLink:
+        """Returns the link between two nodes."""
+        try:
+            return self._link_between_nodes[frozenset((node1_address, node2_address))]
+        except KeyError:
+            raise Exception(f"Link between node {node1_address} and "
+                            f"node {node2_address} does not exist.") from None
+
+    def send_data_to_medium(self, data: Packet) -> Generator[Event, Any, Any]:
         """Sends the data to the medium in order to reach other nodes."""
-        origin_address, destination_address, _ = get_components_of_message(data)
-        if destination_address == '':
+        origin_address, destination_address = data.origin, data.destination
+        if self._trace_sink is not None:
+            self._trace_sink.record(EventType.TRANSMITTED, self.env.now, data,
+                                    address_id(origin_address), destination_address)
+        if destination_address == BROADCAST:
             # For broadcast, find all the links available from origin
-            links = get_all_links_of_node(origin_address, self._links)
-            for link in links:
-                destination = link.get_destination(origin_address)
-                # In case of broadcast, the messages are not delayed
-                # noinspection PyArgumentEqualDefault
-                yield self.env.timeout(0)
+            links = self.get_all_links_of_node(origin_address)
+            destinations = [link.get_destination(origin_address) for link in links]
+            # In case of broadcast, the messages are not delayed and every
+            # neighbour receives them, in order, from a single event
+            # noinspection PyArgumentEqualDefault
+            yield self.env.timeout(0)
+            for destination in destinations:
+                self._trace_delivery(data, destination.address)
                 destination.receive_message(data)
         else:
             # In case of message to specific node, the message is delayed
-            link = get_link_between_nodes(origin_address, destination_address, self._links)
+            link = self.get_link_between_nodes(origin_address, destination_address)
             destination = link.get_destination(origin_address)
             # Wait for a realization of the delay random variable
             yield self.env.timeout(link.get_delay())
+            self._trace_delivery(data, destination.address)
             destination.receive_message(data)
+
+    def _trace_delivery(self, data: Packet, destination_address: str) -> None:
+        """Streams the delivery of a packet to the trace sink, if any."""
+        if self._trace_sink is not None:
+            self._trace_sink.record(EventType.DELIVERED, self.env.now, data,
+                                    address_id(data.origin), destination_address)
@@ -12,7 +12,8 @@ class Network:
 
     def __init__(self, nodes: Iterable[Node], links: Iterable[Link]) -> None:
         self.nodes = sorted(nodes, key=lambda node: node.address)
-        self.links = links
+        # Sorted, so the order of the events does not depend on the order of a set of links
+        self.links = sorted(links, key=lambda link: [node.address for node in link.nodes])
 
     @print_with_asterisks
     def display_summary(self) -> None:
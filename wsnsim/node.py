@@ -1,18 +1,26 @@
 """Everything related with the simulation of a node."""
 
-from typing import Union, Optional, Callable, Iterable, Type, Generator, Any
+from sys import intern
+from typing import Union, Optional, Callable, Iterable, Type, Generator, Any, Dict
 
 from simpy import Environment, Event
 
 from .routing import MinHopRouting, MinHopRoutingSink, ETX, ETXSink, DAPRouting, DAPRoutingSink
 from .routing import RoutingProtocol
+from .packet import Packet, PacketKind
+from .recorder import Retention
+from .link_estimator import LinkEstimator, DEFAULT_LINK_ESTIMATOR
+from .time_grid import TimeGrid, DEFAULT_TIME_GRID
+from .trace_file import TraceSink
+from .tracing import Tracer, TraceLevel, DISABLED_TRACER
 
 
 class _Node:
     """Defines attributes and methods needed in both sink and sensing nodes."""
 
     def __init__(self, address: str, name: Optional[str] = None) -> None:
-        self.address = address
+        # Interned, so comparing the addresses carried by packets is cheap
+        self.address = intern(address)
         if name:
             self.name = name
         else:
@@ -53,66 +61,80 @@ class _SimulationNode(_Node):
     """Extends Node class in order to simulate."""
 
     def __init__(self, address: str, name: str, routing_protocol: Type[RoutingProtocol],
-                 access_function: Callable[[str], Generator[Event, Any, Any]], env: Environment) -> None:
+                 access_function: Callable[[Packet], Generator[Event, Any, Any]], env: Environment,
+                 tracer: Tracer = DISABLED_TRACER, protocol_options: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(address, name)
-        self.routing_protocol = routing_protocol(address, access_function, env)
+        # 'protocol_options' are the settings of the simulation passed to the routing protocol
+        self.routing_protocol = routing_protocol(address, access_function, env, **(protocol_options or {}))
         self.env = env
+        self._tracer = tracer
+        self._trace_level = tracer.level_for(self.address)
 
-    def _send_message(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def seed_random_streams(self, seed_value: int) -> None:
+        """Restarts the random streams of the node."""
+        self.routing_protocol.seed_random_stream(seed_value)
+
+    def _send_message(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Sends a message to sink or neighbour nodes."""
         # Pass the message to the routing protocol
-        event = self.routing_protocol.add_to_output_queue(message, destination)
+        event = self.routing_protocol.add_to_output_queue(packet, destination)
         yield self.env.process(event)
 
-    def receive_message(self, message: str) -> None:
+    def receive_message(self, packet: Packet) -> None:
         """Receive a message from another node."""
         # Pass the message to the routing protocol in order to analyze it
-        self.routing_protocol.receive_packet(message)
+        self.routing_protocol.receive_packet(packet)
 
-    def _print_info(self, info: str) -> None:
-        """Print information with format."""
-        print(f'{self.env.now:.2f} | {self.address} | {info}')
+    def _trace(self, info: str) -> None:
+        """Traces information with format."""
+        self._tracer.write(self.env.now, self.address, info)
 
 
 class SimulationSensingNode(_SimulationNode, SensingNode):
     """Extends SensingNode and SimulationNode class in order to simulate."""
 
     def __init__(self, address: str, name: str, routing_protocol: Type[RoutingProtocol],
-                 access_function: Callable[[str], Generator[Event, Any, Any]], env: Environment, sensing_period: float,
-                 sensing_offset: float) -> None:
-        _SimulationNode.__init__(self, address, name, routing_protocol, access_function, env)
+                 access_function: Callable[[Packet], Generator[Event, Any, Any]], env: Environment,
+                 sensing_period: float, sensing_offset: float, tracer: Tracer = DISABLED_TRACER,
+                 protocol_options: Optional[Dict[str, Any]] = None) -> None:
+        _SimulationNode.__init__(self, address, name, routing_protocol, access_function, env, tracer,
+                                 protocol_options)
         SensingNode.__init__(self, address, sensing_period=sensing_period, sensing_offset=sensing_offset)
         self.env.process(self._main_routine())
 
     def _main_routine(self) -> Generator[Event, Any, Any]:
         """Main routine of the nodes."""
-        self._print_info('is awake')
+        if self._trace_level >= TraceLevel.INFO:
+            self._trace('is awake')
         # Start routing protocol setup routine
         self.env.process(self.routing_protocol.setup())
         # Wait for the sensing offset
         yield self.env.timeout(self.sensing_offset)
         while True:
             # Sensing every 15 minutes
-            event = self._send_message(self._format_measurement('X'), 'sink')
+            event = self._send_message(self._create_measurement_packet('X'), 'sink')
             self.env.process(event)
             yield self.env.timeout(self.sensing_period)
 
-    def _format_measurement(self, measurement: str) -> str:
-        """Formats the measurement to include address and timestamp."""
-        return f'{self.address}/{measurement}/{self.env.now:.2f}'
+    def _create_measurement_packet(self, measurement: str) -> Packet:
+        """Creates a data packet with the measurement, address and timestamp."""
+        return Packet(PacketKind.DATA, measurement, self.address, self.env.now)
 
 
 class SimulationSinkNode(_SimulationNode, SinkNode):
     """Extends SinkNode and SimulationNode class in order to simulate."""
 
     def __init__(self, address: str, name: str, routing_protocol: Type[RoutingProtocol],
-                 access_function: Callable[[str], Generator[Event, Any, Any]], env: Environment) -> None:
-        _SimulationNode.__init__(self, address, name, routing_protocol, access_function, env)
+                 access_function: Callable[[Packet], Generator[Event, Any, Any]], env: Environment,
+                 tracer: Tracer = DISABLED_TRACER, protocol_options: Optional[Dict[str, Any]] = None) -> None:
+        _SimulationNode.__init__(self, address, name, routing_protocol, access_function, env, tracer,
+                                 protocol_options)
         self.env.process(self._main_routine())
 
     def _main_routine(self) -> Generator[Event, Any, Any]:
         """Main routine of the nodes."""
-        self._print_info('is awake')
+        if self._trace_level >= TraceLevel.INFO:
+            self._trace('is awake')
         # Start routing protocol setup routine
         self.env.process(self.routing_protocol.setup())
         # noinspection PyArgumentEqualDefault
@@ -127,8 +149,13 @@ def convert_to_simulation_nodes(
         regular_nodes: Iterable[Node],
         routing_protocol: str,
         deadline: float,
-        send_data_function: Callable[[str], Generator[Event, Any, Any]],
-        env: Environment) -> Iterable[SimulationNode]:
+        send_data_function: Callable[[Packet], Generator[Event, Any, Any]],
+        env: Environment,
+        log_retention: Optional[Dict[str, Retention]] = None,
+        tracer: Tracer = DISABLED_TRACER,
+        trace_sink: Optional[TraceSink] = None,
+        time_grid: TimeGrid = DEFAULT_TIME_GRID,
+        link_estimator: LinkEstimator = DEFAULT_LINK_ESTIMATOR) -> Iterable[SimulationNode]:
     """Returns simulation nodes from regular nodes."""
     simulation_nodes = []
     if routing_protocol == 'min-hop':
@@ -140,10 +167,17 @@ def convert_to_simulation_nodes(
     elif routing_protocol == 'dap':
         routing_sensing_node = DAPRouting
         routing_sink_node = DAPRoutingSink
-        routing_sensing_node.deadline = deadline
-        routing_sink_node.deadline = deadline
     else:  # Default routing protocol
         raise ValueError(f"{routing_protocol} is not a valid protocol")
+    # Settings of this simulation, given to every protocol instead of changing the shared classes
+    protocol_options = {'deadline': deadline,
+                        'log_retention': log_retention,
+                        'tracer': tracer,
+                        'trace_sink': trace_sink}
+    if routing_protocol == 'etx':
+        protocol_options['link_estimator'] = link_estimator
+    elif routing_protocol == 'dap':
+        protocol_options['time_grid'] = time_grid
     for node in regular_nodes:
         if isinstance(node, SensingNode):
             simulation_node = SimulationSensingNode(node.address,
@@ -152,13 +186,17 @@ def convert_to_simulation_nodes(
                                                     send_data_function,
                                                     env,
                                                     node.sensing_period,
-                                                    node.sensing_offset)
+                                                    node.sensing_offset,
+                                                    tracer,
+                                                    protocol_options)
         elif isinstance(node, SinkNode):
             simulation_node = SimulationSinkNode(node.address,
                                                  node.name,
                                                  routing_sink_node,
                                                  send_data_function,
-                                                 env)
+                                                 env,
+                                                 tracer,
+                                                 protocol_options)
         else:
             raise AttributeError('Class of node is not correct')
         simulation_nodes.append(simulation_node)
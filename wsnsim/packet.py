@@ -0,0 +1,83 @@
+"""Packets exchanged by the nodes through the medium."""
+
+from enum import IntEnum
+from itertools import count
+from typing import Any, Optional
+
+BROADCAST = ''  # Next-hop address of a packet sent to every neighbour
+
+# Every new packet gets a different id, also in simulations running in threads (next() holds the GIL)
+_packet_ids = count()
+
+
+class PacketKind(IntEnum):
+    """Kind of information carried by a packet."""
+    DATA = 0  # Measurement generated by a sensing node
+    HELLO = 1  # Neighbour discovery (with the hop count in min-hop)
+    ETX = 2  # Advertisement of the ETX of a node
+    DAP = 3  # Advertisement of the DAP of a node
+    PROBE = 4  # Dummy packet used to measure the link delay
+
+
+class Packet:
+    """Packet carried by the medium.
+
+    'origin' and 'destination' are the addresses of the current hop, while
+    'packet_id', 'source', 'value' and 'timestamp' are kept along the whole
+    route.
+    """
+    __slots__ = ('packet_id', 'kind', 'origin', 'destination', 'source', 'value', 'timestamp')
+
+    def __init__(self,
+                 kind: PacketKind,
+                 value: Any = None,
+                 source: Optional[str] = None,
+                 timestamp: float = 0.0,
+                 origin: Optional[str] = None,
+                 destination: Optional[str] = None,
+                 packet_id: Optional[int] = None) -> None:
+        self.packet_id = next(_packet_ids) if packet_id is None else packet_id
+        self.kind = kind
+        self.value = value
+        self.source = source
+        self.timestamp = timestamp
+        self.origin = origin
+        self.destination = destination
+
+    def for_hop(self, origin: str, destination: str) -> 'Packet':
+        """Returns a copy of the packet addressed for the next hop."""
+        return Packet(self.kind, self.value, self.source, self.timestamp, origin, destination, self.packet_id)
+
+    @property
+    def payload_size(self) -> int:
+        """Returns the size in bytes of the information carried.
+
+        Binary payloads have their own size, numbers are counted as 8 bytes
+        and text as its UTF-8 encoding.
+        """
+        value = self.value
+        if value is None:
+            return 0
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, str):
+            return len(value.encode())
+        return 8
+
+    def payload_to_text(self) -> str:
+        """Returns the text version of the information carried."""
+        if self.kind == PacketKind.DATA:
+            return f'{self.source}/{self.value}/{self.timestamp:.2f}'
+        if self.kind == PacketKind.HELLO:
+            return 'Hello' if self.value is None else f'Hello+{self.value}'
+        if self.kind == PacketKind.PROBE:
+            return 'Probe+dummy'
+        if self.kind == PacketKind.DAP:
+            return f'DAP+{self.payload_size} bytes'
+        return f'{self.kind.name}+{self.value}'
+
+    def __repr__(self):
+        # Only for debugging, the packets are never parsed from text
+        return f'{self.origin},{self.destination},{self.payload_to_text()}'
+
+    __str__ = __repr__
@@ -1,12 +1,72 @@
-"""Everything related with the calculation of performance goes here."""
-from typing import Iterable, Tuple, List, Dict
+"""Everything related with the calculation of performance goes here.
 
-import matplotlib.pyplot as plt
+matplotlib is slow to import, so it is only imported by the functions that plot.
+"""
+import os
+from typing import Tuple, Dict, Iterable, List
 
-from .auxiliary_functions import get_components_of_message, is_hello_message, \
-    parse_payload, is_etx_message, is_dap_message
+import numpy as np
+
+from .delay_statistics import DelayStatistics, DEFAULT_BIN_WIDTH
 from .network import SimulationNetwork
 from .node import get_sink_node
+from .packet import PacketKind
+from .recorder import EventLog, address_from_id
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class NodeReport:
+    """End-to-end performance of one sensing node."""
+
+    def __init__(self,
+                 address: str,
+                 deliveries: int,
+                 dmr: float,
+                 mean: float,
+                 standard_deviation: float,
+                 quantiles: Dict[float, float],
+                 histogram_counts: np.ndarray,
+                 histogram_edges: np.ndarray) -> None:
+        self.address = address
+        self.deliveries = deliveries
+        self.dmr = dmr
+        self.mean = mean
+        self.standard_deviation = standard_deviation
+        self.quantiles = quantiles
+        # The histogram has len(edges) - 1 bins
+        self.histogram_counts = histogram_counts
+        self.histogram_edges = histogram_edges
+
+    def as_dict(self) -> Dict:
+        """Returns the report with plain Python types, e.g. to save it as JSON."""
+        return {
+            'address': self.address,
+            'deliveries': self.deliveries,
+            'dmr': self.dmr,
+            'mean': self.mean,
+            'standard_deviation': self.standard_deviation,
+            'quantiles': {str(q): value for q, value in self.quantiles.items()},
+            'histogram_counts': self.histogram_counts.tolist(),
+            'histogram_edges': self.histogram_edges.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, report: Dict) -> 'NodeReport':
+        """Builds a report from the output of as_dict()."""
+        return cls(report['address'],
+                   report['deliveries'],
+                   report['dmr'],
+                   report['mean'],
+                   report['standard_deviation'],
+                   {float(q): value for q, value in report['quantiles'].items()},
+                   np.array(report['histogram_counts']),
+                   np.array(report['histogram_edges']))
+
+    def __repr__(self):
+        return f'(Address: {self.address}, Deliveries: {self.deliveries}, DMR: {self.dmr}, Mean: {self.mean})'
+
+    __str__ = __repr__
 
 
 class NetworkPerformance:
@@ -17,62 +77,130 @@ class NetworkPerformance:
         self.sink = get_sink_node(self.nodes)
         self.nodes.remove(self.sink)
         self.deadline = deadline
-        self.show_end_to_end_statistics()
 
-    def calculate_end_to_end_delay_pdf(self) -> Dict:
-        """Calculates the end to end delay pdf for every sensing node."""
-        sink_received_messages = self.sink.routing_protocol._received_messages
+    def calculate_end_to_end_delay_pdf(self, start_time: float = 0.0) -> Dict[str, np.ndarray]:
+        """Calculates the end to end delays of every sensing node, of the data received from 'start_time'."""
+        sink_received_messages = self.sink.routing_protocol.recorder.received
         # Calculate the end to end delay
-        end_to_end_list = get_end_to_end_delay_list(sink_received_messages)
-        # Split the list for every sensing node
-        end_to_end_dict = split_end_to_end_delay_list(end_to_end_list)
-        return end_to_end_dict
+        sources, delays = get_end_to_end_delays(sink_received_messages, start_time)
+        # Split the delays for every sensing node
+        return split_end_to_end_delays(sources, delays)
+
+    def report(self, quantiles: Iterable[float] = DEFAULT_QUANTILES,
+               bin_width: float = DEFAULT_BIN_WIDTH, start_time: float = 0.0) -> Dict[str, NodeReport]:
+        """Returns the performance of every sensing node that delivered data.
+
+        The delays logged by the sink are used if every received message was
+        kept, otherwise the statistics updated online by the sink are used
+        (and 'start_time', the end of the warm-up, is ignored). Nothing is
+        plotted.
+        """
+        quantiles = tuple(quantiles)
+        routing_protocol = self.sink.routing_protocol
+        if routing_protocol.recorder.received.retention.limit is None:
+            reports = {address: report_from_delays(address, delays, self.deadline, quantiles, bin_width)
+                       for address, delays in self.calculate_end_to_end_delay_pdf(start_time).items()}
+        else:
+            reports = {address: report_from_statistics(address, statistics, quantiles)
+                       for address, statistics in routing_protocol.delay_statistics.items()}
+        # Same order as the nodes of the network
+        return {node.address: reports[node.address] for node in self.nodes if node.address in reports}
 
     def show_end_to_end_statistics(self):
-        """Plots the statistics."""
-        end_to_end_delay = self.calculate_end_to_end_delay_pdf()
-        for node, delay_list in end_to_end_delay.items():
-            # Calculate DMR
-            node_dmr = calculate_dmr(delay_list, self.deadline)
-            print(f'Node {node} DMR: {node_dmr}')
+        """Prints and plots the statistics in blocking windows."""
+        import matplotlib.pyplot as plt
+
+        for address, node_report in self.report().items():
+            print(f'Node {address} DMR: {node_report.dmr}')
             # Plot delay histogram
             plt.figure()
-            plt.hist(delay_list, density=True)
-            plt.grid()
-            plt.title(node)
+            _plot_histogram(plt.gca(), node_report)
             plt.show()
 
 
-def calculate_dmr(delay_list: list, deadline: float) -> float:
+def report_from_delays(address: str, delays: np.ndarray, deadline: float,
+                       quantiles: Tuple[float, ...] = DEFAULT_QUANTILES,
+                       bin_width: float = DEFAULT_BIN_WIDTH) -> NodeReport:
+    """Returns the report of a node from its end-to-end delays."""
+    number_of_bins = max(int(np.ceil(delays.max() / bin_width)), 1)
+    edges = np.arange(number_of_bins + 1) * bin_width
+    counts, _ = np.histogram(delays, bins=edges)
+    standard_deviation = float(delays.std(ddof=1)) if len(delays) > 1 else 0.0
+    return NodeReport(address,
+                      len(delays),
+                      calculate_dmr(delays, deadline),
+                      float(delays.mean()),
+                      standard_deviation,
+                      dict(zip(quantiles, np.quantile(delays, quantiles).tolist())),
+                      counts,
+                      edges)
+
+
+def report_from_statistics(address: str, statistics: DelayStatistics,
+                           quantiles: Tuple[float, ...] = DEFAULT_QUANTILES) -> NodeReport:
+    """Returns the report of a node from the statistics updated online."""
+    counts = np.array(statistics.histogram.counts)
+    # The last bin, which holds every larger delay, is shown as a regular bin
+    number_of_bins = np.nonzero(counts)[0].max() + 1
+    edges = np.arange(number_of_bins + 1) * statistics.histogram.bin_width
+    return NodeReport(address,
+                      statistics.count,
+                      statistics.dmr,
+                      statistics.mean,
+                      statistics.standard_deviation,
+                      {q: statistics.quantile(q) for q in quantiles},
+                      counts[:number_of_bins],
+                      edges)
+
+
+def plot_report(report: Dict[str, NodeReport], directory: str, file_format: str = 'png') -> List[str]:
+    """Saves the delay histogram of every node in a file, without any window.
+
+    Returns the paths of the files.
+    """
+    from matplotlib.figure import Figure
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for address, node_report in report.items():
+        figure = Figure()
+        _plot_histogram(figure.add_subplot(), node_report)
+        path = os.path.join(directory, f'node_{address}.{file_format}')
+        figure.savefig(path)
+        paths.append(path)
+    return paths
+
+
+def _plot_histogram(axes, node_report: NodeReport) -> None:
+    """Plots the delay histogram of a node, normalized as a density."""
+    edges = node_report.histogram_edges
+    density = node_report.histogram_counts / (node_report.deliveries * np.diff(edges))
+    # One sample per bin weighted with its density, Axes.stairs() needs matplotlib 3.4
+    axes.hist(edges[:-1], edges, weights=density)
+    axes.grid()
+    axes.set_title(f'{node_report.address} (DMR: {node_report.dmr:.4f})')
+
+
+def calculate_dmr(delays: np.ndarray, deadline: float) -> float:
     """Returns the node's deadline miss ratio (DMR)."""
-    miss = 0
-    for delay in delay_list:
-        if delay > deadline:
-            miss += 1
-    return miss/len(delay_list)
-
-
-def get_end_to_end_delay_list(received_messages: Iterable[Tuple[float, str]]) -> Iterable[Tuple[str, float]]:
-    """Returns a list of (origin, delay) tuples from a sink received messages list."""
-
-    end_to_end_list: List[Tuple[str, float]] = []
-    for incoming_time, data in received_messages:
-        _, _, message = get_components_of_message(data)
-        if is_hello_message(message) or is_etx_message(message) or is_dap_message(message):
-            continue
-        source, _, measurement_time = parse_payload(message)
-        delay = incoming_time - measurement_time
-        end_to_end_list.append((source, delay))
-    return end_to_end_list
-
-
-def split_end_to_end_delay_list(end_to_end_list: Iterable[Tuple[str, float]]) -> Dict:
-    """Splits the delay list and returns a dictionary."""
-
-    split_delay_dict = {}
-    for node, delay in end_to_end_list:
-        if node in split_delay_dict:
-            split_delay_dict[node].append(delay)
-        else:
-            split_delay_dict[node] = [delay]
-    return split_delay_dict
+    return np.count_nonzero(np.asarray(delays) > deadline) / len(delays)
+
+
+def get_end_to_end_delays(received_messages: EventLog, start_time: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the source ids and the delays of the data in a sink received messages log."""
+    data = received_messages.column('kind') == PacketKind.DATA
+    if start_time > 0:
+        data &= received_messages.column('timestamp') >= start_time
+    sources = received_messages.column('source')[data]
+    delays = received_messages.column('timestamp')[data] - received_messages.column('created')[data]
+    return sources, delays
+
+
+def split_end_to_end_delays(sources: np.ndarray, delays: np.ndarray) -> Dict[str, np.ndarray]:
+    """Splits the delays by source and returns a dictionary with the addresses as keys."""
+    # A stable sort keeps the delays of every source in arrival order
+    order = np.argsort(sources, kind='stable')
+    sorted_sources = sources[order]
+    unique_sources, starts = np.unique(sorted_sources, return_index=True)
+    split_delays = np.split(delays[order], starts[1:])
+    return {address_from_id(source): source_delays for source, source_delays in zip(unique_sources, split_delays)}
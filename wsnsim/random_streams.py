@@ -0,0 +1,31 @@
+"""Independent random streams of the entities of a simulation.
+
+Every link and every node tie-breaker draws from its own stream. The
+streams are spawned from the seed of the run with a NumPy SeedSequence keyed
+by the kind of entity and its addresses, so a stream does not depend on the
+order of the events, of the links or of the nodes.
+
+The traffic sources have no stream: a sensing node measures at fixed times
+(its sensing offset, then every sensing period), so nothing random is drawn
+for them.
+"""
+
+from random import Random
+
+import numpy as np
+
+
+def stream_seed(seed_value: int, kind: str, *addresses: str) -> np.random.SeedSequence:
+    """Returns the seed of the stream of an entity, e.g. stream_seed(1, 'link', '0', '1')."""
+    key = '|'.join((kind, *addresses)).encode()
+    return np.random.SeedSequence([seed_value, *key])
+
+
+def integer_seed(seed_sequence: np.random.SeedSequence) -> int:
+    """Returns 128 bits of a seed sequence as an integer, to seed Python generators."""
+    return int.from_bytes(seed_sequence.generate_state(4).tobytes(), 'little')
+
+
+def python_random(seed_sequence: np.random.SeedSequence) -> Random:
+    """Returns a Python generator seeded with 128 bits of a seed sequence."""
+    return Random(integer_seed(seed_sequence))
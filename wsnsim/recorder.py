@@ -0,0 +1,208 @@
+"""Records the events of the routing protocols in columnar arrays.
+
+Every log keeps the columns (timestamp, kind, node, peer, packet, source,
+created) in growable typed arrays. Addresses are stored as integer ids, use
+address_from_id() to recover them. The broadcast address has the reserved id
+BROADCAST_ID and is never registered. The ids are shared by every simulation of
+the process, also by the ones running in threads, and only identify the
+addresses: no result depends on them. The events can also be streamed to a
+trace sink, see trace_file.py.
+"""
+
+from enum import IntEnum
+from threading import Lock
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from .packet import Packet, BROADCAST
+
+EVENT_COLUMNS = {
+    'timestamp': np.float64,  # When the event happened
+    'kind': np.int8,  # PacketKind of the packet involved
+    'node': np.int32,  # Node that logged the event
+    'peer': np.int32,  # Origin of a received packet or destination of a sent one (BROADCAST_ID for all)
+    'packet': np.int64,  # Id of the packet
+    'source': np.int32,  # Node that generated the measurement (-1 if none)
+    'created': np.float64,  # When the measurement was generated
+}
+INITIAL_CAPACITY = 1024
+BROADCAST_ID = -2  # Id of the broadcast address, -1 is the id of no address
+
+
+class EventType(IntEnum):
+    """Kind of event logged."""
+    RECEIVED = 0  # A node received a packet
+    OUTPUT_QUEUE = 1  # A packet arrived to the output queue of a node
+    SENDING = 2  # A node started to send a packet
+    SENT = 3  # A node finished sending a packet
+    TRANSMITTED = 4  # The medium started to carry a packet
+    DELIVERED = 5  # The medium delivered a packet to a node
+
+
+LOG_NAMES = ('received', 'output_queue', 'sending', 'sent')
+LOG_EVENTS = {
+    'received': EventType.RECEIVED,
+    'output_queue': EventType.OUTPUT_QUEUE,
+    'sending': EventType.SENDING,
+    'sent': EventType.SENT,
+}
+
+_address_ids: Dict[str, int] = {}
+_addresses = []
+_new_address_lock = Lock()  # So two threads never give the same id to different addresses
+
+
+def address_id(address: Optional[str]) -> int:
+    """Returns the integer id used for an address in the logs."""
+    if address is None:
+        return -1
+    if address == BROADCAST:
+        return BROADCAST_ID
+    identifier = _address_ids.get(address)
+    if identifier is None:
+        with _new_address_lock:
+            # Another thread may have added the address while this one waited
+            identifier = _address_ids.get(address)
+            if identifier is None:
+                identifier = len(_addresses)
+                # The address is added first, so every id that can be read has its address
+                _addresses.append(address)
+                _address_ids[address] = identifier
+    return identifier
+
+
+def known_addresses() -> List[str]:
+    """Returns every address with an id, the position in the list is the id."""
+    return _addresses
+
+
+def address_from_id(identifier: int) -> Optional[str]:
+    """Returns the address that corresponds to an id used in the logs."""
+    if identifier == BROADCAST_ID:
+        return BROADCAST
+    if identifier < 0:
+        return None
+    return _addresses[identifier]
+
+
+class Retention:
+    """How many events a log keeps: none, the last N or all of them."""
+
+    def __init__(self, limit: Optional[int]) -> None:
+        if limit is not None and limit < 0:
+            raise ValueError('The number of events to keep cannot be negative')
+        self.limit = limit
+
+    @classmethod
+    def off(cls) -> 'Retention':
+        """Nothing is kept."""
+        return cls(0)
+
+    @classmethod
+    def ring(cls, size: int) -> 'Retention':
+        """Only the last 'size' events are kept."""
+        return cls(size)
+
+    @classmethod
+    def full(cls) -> 'Retention':
+        """Every event is kept."""
+        return cls(None)
+
+    def __repr__(self):
+        if self.limit is None:
+            return 'Retention.full()'
+        if self.limit == 0:
+            return 'Retention.off()'
+        return f'Retention.ring({self.limit})'
+
+    __str__ = __repr__
+
+
+class EventLog:
+    """Log of one category of events, kept according to a retention policy."""
+
+    def __init__(self, node: str, retention: Retention, event: EventType = EventType.RECEIVED,
+                 sink: Optional[Any] = None) -> None:
+        self.node = address_id(node)
+        self.retention = retention
+        self.event = event
+        # Trace sink that also receives every event, regardless of the retention
+        self._sink = sink
+        if retention.limit is None:
+            capacity = INITIAL_CAPACITY
+        else:
+            capacity = retention.limit
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in EVENT_COLUMNS.items()}
+        self._capacity = capacity
+        self._next = 0  # Position where the next event is written
+        self._count = 0  # Events kept
+        self.total = 0  # Events logged, including the discarded ones
+
+    def record(self, timestamp: float, packet: Packet, peer: Optional[str]) -> None:
+        """Adds an event to the log."""
+        self.total += 1
+        if self._sink is not None:
+            self._sink.record(self.event, timestamp, packet, self.node, peer)
+        limit = self.retention.limit
+        if limit == 0:
+            return
+        if self._next == self._capacity:
+            if limit is None:
+                # Full retention: the arrays grow
+                self._grow()
+            else:
+                # Ring buffer: the oldest events are overwritten
+                self._next = 0
+        index = self._next
+        columns = self._columns
+        columns['timestamp'][index] = timestamp
+        columns['kind'][index] = packet.kind
+        columns['node'][index] = self.node
+        columns['peer'][index] = address_id(peer)
+        columns['packet'][index] = packet.packet_id
+        columns['source'][index] = address_id(packet.source)
+        columns['created'][index] = packet.timestamp
+        self._next += 1
+        if limit is None or self._count < limit:
+            self._count += 1
+
+    def _grow(self) -> None:
+        """Doubles the capacity of every column."""
+        for name, column in self._columns.items():
+            grown_column = np.zeros(2 * self._capacity, dtype=column.dtype)
+            grown_column[:self._capacity] = column
+            self._columns[name] = grown_column
+        self._capacity *= 2
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns one column of the events kept, in chronological order."""
+        column = self._columns[name]
+        if self._count < self._capacity or self.retention.limit is None:
+            return column[:self._count]
+        # The ring buffer is full, the oldest event is the next to overwrite
+        return np.concatenate((column[self._next:], column[:self._next]))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Returns every column of the events kept, in chronological order."""
+        return {name: self.column(name) for name in self._columns}
+
+    def __len__(self):
+        return self._count
+
+
+class MessageRecorder:
+    """Logs of the messages received, queued, being sent and sent by a node."""
+
+    def __init__(self, address: str, retention: Optional[Dict[str, Retention]] = None,
+                 sink: Optional[Any] = None) -> None:
+        retention = retention or {}
+        unknown_logs = set(retention) - set(LOG_NAMES)
+        if unknown_logs:
+            raise ValueError(f'{unknown_logs} are not valid logs, use some of {LOG_NAMES}')
+        logs = {name: EventLog(address, retention.get(name, Retention.full()), LOG_EVENTS[name], sink)
+                for name in LOG_NAMES}
+        self.received = logs['received']
+        self.output_queue = logs['output_queue']
+        self.sending = logs['sending']
+        self.sent = logs['sent']
@@ -0,0 +1,129 @@
+"""Independent replications of a simulation, run in parallel.
+
+Every replication is a new simulation of the same network with its own seed,
+spawned from a root seed, so the results are the same whatever the number of
+workers. The DMR, the mean delay and the delay quantiles of every node are
+averaged over the replications with Student's t confidence intervals.
+
+The workers are forked, so the network (and the lambdas of its links) is not
+pickled. Where forking is not available the replications run one by one.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt, nan
+from typing import Dict, List, Iterable, Optional, Any, Tuple, Callable
+
+import numpy as np
+
+from .network import Network
+from .performance import NodeReport, DEFAULT_QUANTILES
+from .simulation import Simulation, DEFAULT_SEED, DEFAULT_CONFIDENCE
+
+# Arguments of the replications, inherited by the forked workers
+_replication_setup: Optional[Tuple] = None
+
+
+class Estimate:
+    """Mean of a value over the replications and its confidence interval."""
+
+    def __init__(self, values: Iterable[float], confidence: float = DEFAULT_CONFIDENCE) -> None:
+        values = np.asarray(list(values), dtype=float)
+        self.replications = len(values)
+        self.mean = float(values.mean()) if len(values) else nan
+        if len(values) > 1:
+            from scipy.stats import t
+
+            standard_error = values.std(ddof=1) / sqrt(len(values))
+            self.half_width = float(t.ppf((1 + confidence) / 2, len(values) - 1) * standard_error)
+        else:
+            self.half_width = nan
+        self.confidence = confidence
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        """Returns the limits of the confidence interval."""
+        return self.mean - self.half_width, self.mean + self.half_width
+
+    def __repr__(self):
+        return f'{self.mean} ± {self.half_width}'
+
+    __str__ = __repr__
+
+
+class ReplicatedNodeReport:
+    """End-to-end performance of one sensing node over every replication."""
+
+    def __init__(self, address: str, reports: List[NodeReport], confidence: float = DEFAULT_CONFIDENCE) -> None:
+        self.address = address
+        # Of the replications where the node delivered data, in order of seed
+        self.reports = reports
+        self.dmr = Estimate((report.dmr for report in reports), confidence)
+        self.mean = Estimate((report.mean for report in reports), confidence)
+        quantiles = reports[0].quantiles if reports else {}
+        self.quantiles = {q: Estimate((report.quantiles[q] for report in reports), confidence)
+                          for q in quantiles}
+
+    def __repr__(self):
+        return f'(Address: {self.address}, Replications: {len(self.reports)}, DMR: {self.dmr}, Mean: {self.mean})'
+
+    __str__ = __repr__
+
+
+def replication_seeds(seed_value: int, replications: int) -> List[int]:
+    """Returns independent seeds spawned from a root seed."""
+    children = np.random.SeedSequence(seed_value).spawn(replications)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_replications(network: Network, routing_protocol: str, deadline: float, time: float,
+                     replications: int, workers: Optional[int] = None,
+                     seed_value: int = DEFAULT_SEED,
+                     confidence: float = DEFAULT_CONFIDENCE,
+                     quantiles: Iterable[float] = DEFAULT_QUANTILES,
+                     warm_start: bool = False,
+                     **simulation_options: Any) -> Dict[str, ReplicatedNodeReport]:
+    """Runs independently seeded replications and returns the performance of every sensing node.
+
+    'workers' is the number of processes, every core is used if it is not
+    given. 'simulation_options' are passed to every Simulation, e.g. time_grid.
+    """
+    global _replication_setup
+    seeds = replication_seeds(seed_value, replications)
+    _replication_setup = (network, routing_protocol, deadline, time, tuple(quantiles), warm_start,
+                          simulation_options)
+    try:
+        results = map_in_processes(_run_replication, seeds, workers)
+    finally:
+        _replication_setup = None
+    reports_of_node: Dict[str, List[NodeReport]] = {}
+    for result in results:
+        for address, report in result.items():
+            reports_of_node.setdefault(address, []).append(report)
+    return {address: ReplicatedNodeReport(address, reports, confidence)
+            for address, reports in reports_of_node.items()}
+
+
+def map_in_processes(function: Callable[[Any], Any], arguments: List[Any], workers: Optional[int] = None) -> List:
+    """Returns the results of a function for every argument, in order, computed by forked workers.
+
+    Every core is used if 'workers' is not given. The function and the
+    arguments are pickled, anything else is inherited by the workers.
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(arguments))
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            return list(executor.map(function, arguments))
+    return [function(argument) for argument in arguments]
+
+
+def _run_replication(seed_value: int) -> Dict[str, NodeReport]:
+    """Runs one replication with the arguments of _replication_setup."""
+    network, routing_protocol, deadline, time, quantiles, warm_start, simulation_options = _replication_setup
+    simulation = Simulation(network, routing_protocol, deadline, **simulation_options)
+    if warm_start:
+        simulation.warm_start(seed_value=seed_value)
+    simulation.run(time, seed_value)
+    return simulation.report(quantiles)
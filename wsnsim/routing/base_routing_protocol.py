@@ -1,62 +1,109 @@
 """This module implements a base structure for every routing protocol."""
 
-from typing import Callable, Generator, Any
+from random import Random
+from typing import Callable, Generator, Any, Dict, Optional
 
 from simpy import Event, Environment, Resource
 
+from ..delay_statistics import DelayStatistics
+from ..packet import Packet, PacketKind, BROADCAST
+from ..random_streams import stream_seed, python_random
+from ..recorder import MessageRecorder, Retention
+from ..trace_file import TraceSink
+from ..tracing import Tracer, TraceLevel, DISABLED_TRACER
+
 
 class RoutingProtocol:
     """Base class for every routing protocol."""
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 deadline: Optional[float] = None,
+                 log_retention: Optional[Dict[str, Retention]] = None,
+                 tracer: Tracer = DISABLED_TRACER,
+                 trace_sink: Optional[TraceSink] = None) -> None:
         self.address = address
         self._radio = radio
         self.env = env
+        self.deadline = deadline  # End-to-end deadline, in seconds
         # noinspection PyArgumentEqualDefault
         # 'capacity' sets the quantity of packets that can be sent at the same time
         # 'capacity=1' sets a more realistic model with queue delay for congested networks
         # 'capacity=9999999' sets a less realistic model without queue delay for congested networks
         self._output_queue = Resource(env, capacity=1)
-        # List to save messages in format: (timestamp, message)
-        # Used to calculate performance
-        self._received_messages = []
-        self._output_queue_messages = []
-        self._message_sending = []
-        self._message_sent = []
+        # Method that analyzes every kind of packet, filled by each protocol
+        self._packet_handlers: Dict[PacketKind, Callable[[Packet], None]] = {}
+        # Logs of the messages, used to calculate performance. 'log_retention' sets how many events
+        # are kept in the 'received', 'output_queue', 'sending' and 'sent' logs, every one by default.
+        # Every event is also streamed to 'trace_sink', if any
+        self.recorder = MessageRecorder(address, log_retention, trace_sink)
+        # End-to-end delay statistics of every source, updated by the sink
+        self.delay_statistics: Dict[str, DelayStatistics] = {}
+        # Compared before building any text, so disabled tracing is free
+        self.tracer = tracer
+        self._trace_level = tracer.level_for(address)
+        # Stream of the random tie-breaks between next hops
+        self._random = Random()
+
+    def seed_random_stream(self, seed_value: int) -> None:
+        """Restarts the stream of the tie-breaks, independent of any other node."""
+        self._random = python_random(stream_seed(seed_value, 'node', self.address))
 
     def setup(self) -> Generator[Event, Any, Any]:
         """Any setup code must go here."""
         pass
 
-    def receive_packet(self, message: str) -> Generator[Event, Any, Any]:
+    def receive_packet(self, packet: Packet) -> None:
         """Method called when a packet arrives."""
-        pass
+        self._log_received_message(packet)
+        if self._trace_level >= TraceLevel.PACKET and packet.kind in self.tracer.kinds:
+            self._trace(f'received: {packet}')
+        assert packet.destination == self.address or packet.destination == BROADCAST
+        handler = self._packet_handlers.get(packet.kind)
+        if handler is None:
+            raise ValueError(f'Node {self.address} cannot handle {packet.kind.name} packets')
+        handler(packet)
 
-    def add_to_output_queue(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def add_to_output_queue(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Adds a message to the output queue."""
         pass
 
-    def _print_info(self, info: str, limit: int = 200) -> None:
-        """Prints information with format."""
-        print(f'{self.env.now:.2f} | {self.address} | {info[:limit]}')
+    def _forward_data_packet(self, packet: Packet) -> None:
+        """Forwards a data packet toward the sink."""
+        self.env.process(self.add_to_output_queue(packet, 'sink'))
+
+    def _receive_data_packet(self, packet: Packet) -> None:
+        """Handles a data packet that reached the sink node."""
+        source_statistics = self.delay_statistics.get(packet.source)
+        if source_statistics is None:
+            source_statistics = DelayStatistics(self.deadline)
+            self.delay_statistics[packet.source] = source_statistics
+        source_statistics.update(self.env.now - packet.timestamp)
+        if self._trace_level >= TraceLevel.INFO and PacketKind.DATA in self.tracer.kinds:
+            self._trace(f'message: {packet.payload_to_text()} reached sink node')
+
+    def _ignore_packet(self, packet: Packet) -> None:
+        """Discards a packet that does not carry useful information."""
+        pass
+
+    def _trace(self, info: str) -> None:
+        """Traces information with format."""
+        self.tracer.write(self.env.now, self.address, info)
 
-    def _log_received_message(self, message: str) -> None:
+    def _log_received_message(self, packet: Packet) -> None:
         """Logs the timestamp when a message is received."""
-        self._received_messages.append((self.env.now, message))
+        self.recorder.received.record(self.env.now, packet, packet.origin)
 
-    def _log_output_queue_message(self, message: str, destination: str) -> None:
+    def _log_output_queue_message(self, packet: Packet, destination: str) -> None:
         """Logs the timestamp when a message arrives to output queue."""
-        self._output_queue_messages.append((self.env.now,
-                                            message,
-                                            destination))
+        self.recorder.output_queue.record(self.env.now, packet, destination)
 
-    def _log_message_sending(self, message: str, destination: str) -> None:
+    def _log_message_sending(self, packet: Packet, destination: str) -> None:
         """Logs the timestamp when a message was sent."""
-        self._message_sending.append((self.env.now, message, destination))
+        self.recorder.sending.record(self.env.now, packet, destination)
 
-    def _log_message_sent(self, message: str, destination: str) -> None:
+    def _log_message_sent(self, packet: Packet, destination: str) -> None:
         """Logs the timestamp when a message was sent."""
-        self._message_sent.append((self.env.now, message, destination))
+        self.recorder.sent.record(self.env.now, packet, destination)
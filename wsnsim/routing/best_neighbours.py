@@ -0,0 +1,77 @@
+"""Cache of the neighbours with the minimum metric toward the sink.
+
+Packets are forwarded far more often than the metrics change, so the
+candidates are kept between packets. A change of a metric only updates the
+candidates, they are searched again only when one of them gets a worse
+metric. The search uses a heap of the metrics with lazy deletion: a change
+pushes a new entry and the entry it replaces is discarded when it reaches
+the top, so both cost O(log n) instead of a scan of every neighbour.
+"""
+
+from heapq import heappush, heappop, heapify
+from typing import Dict, List, Optional, Tuple
+
+COMPACTION_SLACK = 64  # Outdated entries allowed in the heap beyond one per neighbour
+
+
+class BestNeighbours:
+    """Addresses of the neighbours with the minimum metric."""
+
+    def __init__(self) -> None:
+        # Entries (metric, sequence, address), only the one with the last sequence of an address is valid
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequences: Dict[str, int] = {}
+        self._next_sequence = 0
+        self._min_metric: Optional[float] = None
+        self._addresses: List[str] = []  # Kept as a list for the random tie-break
+        self._outdated = False
+
+    def update(self, address: str, metric: float) -> None:
+        """Takes into account a new metric (or a new neighbour)."""
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._sequences[address] = sequence
+        heappush(self._heap, (metric, sequence, address))
+        if len(self._heap) > 2 * len(self._sequences) + COMPACTION_SLACK:
+            self._compact()
+        if self._outdated:
+            return
+        if self._min_metric is None or metric < self._min_metric:
+            self._min_metric = metric
+            self._addresses = [address]
+        elif metric == self._min_metric:
+            if address not in self._addresses:
+                self._addresses.append(address)
+        elif address in self._addresses:
+            # One of the best neighbours got worse, the rest may be better now
+            self._outdated = True
+
+    def addresses(self) -> List[str]:
+        """Returns the best neighbours, searched again in the heap only if they are outdated."""
+        if self._outdated:
+            self._search()
+            self._outdated = False
+        return self._addresses
+
+    def _search(self) -> None:
+        """Finds the best neighbours at the top of the heap."""
+        heap, sequences = self._heap, self._sequences
+        best_entries = []
+        while heap:
+            metric, sequence, address = heap[0]
+            if best_entries and metric != best_entries[0][0]:
+                break
+            heappop(heap)
+            if sequence == sequences[address]:
+                best_entries.append((metric, sequence, address))
+        # The valid entries stay in the heap
+        for entry in best_entries:
+            heappush(heap, entry)
+        self._min_metric = best_entries[0][0]
+        self._addresses = [address for _, _, address in best_entries]
+
+    def _compact(self) -> None:
+        """Removes the outdated entries of the heap."""
+        sequences = self._sequences
+        self._heap = [entry for entry in self._heap if entry[1] == sequences[entry[2]]]
+        heapify(self._heap)
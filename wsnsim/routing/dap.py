@@ -8,40 +8,70 @@ DAP:
 the own DAP to max(DAP | next-hop = u_i) and sharing again...
 """
 
-from typing import Callable, Generator, Any, Optional, Dict
-from random import choice
+from typing import Callable, Generator, Any, Optional, Dict, Iterable, List
 
+import numpy as np
 from simpy import Environment, Event
 
 from .base_routing_protocol import RoutingProtocol
-from ..auxiliary_functions import get_components_of_message, is_hello_message, parse_payload, float_range, \
-    divide_vector, multiply_vector, find_index_of_delay, is_dap_message
-
-PDF_AND_DAP_RESOLUTION = 1  # In seconds
-PDF_AND_DAP_DURATION = 30  # In seconds
+from ..tracing import TraceLevel
+from ..packet import Packet, PacketKind
+from ..time_grid import TimeGrid, DEFAULT_TIME_GRID, PDF_AND_DAP_RESOLUTION, PDF_AND_DAP_DURATION  # noqa: F401
+
+# Encodings of the DAP advertisements (little-endian), see encode_dap().
+# 'float32' keeps a relative error below 2**-24 (6e-8) and 'uint16'
+# quantizes the probabilities in steps of 1/65535, with an absolute error
+# below 1/(2*65535) (7.7e-6). 0 and 1 are exact in every encoding.
+DAP_ENCODINGS = {
+    'float64': np.dtype('<f8'),
+    'float32': np.dtype('<f4'),
+    'uint16': np.dtype('<u2'),
+}
+DAP_QUANTIZATION_LEVELS = 65535  # Of the 'uint16' encoding
+# The first byte of a payload is the position of its encoding in DAP_ENCODINGS,
+# so every receiver decodes the advertisements with the encoding of the sender
+_ENCODING_TAGS = {encoding: tag for tag, encoding in enumerate(DAP_ENCODINGS)}
+_TAG_ENCODINGS = list(DAP_ENCODINGS)
+INITIAL_NEIGHBOUR_ROWS = 8  # Of the matrix of the DAP through every neighbour
 
 
 class DelayPDF:
-    """Delay PDF object."""
+    """Delay PDF object.
+
+    It keeps the number of samples of every bin, the normalized pdf is only
+    calculated when it is needed and kept until a new sample arrives.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, grid: TimeGrid = DEFAULT_TIME_GRID) -> None:
+        self.grid = grid
         # The last entry represents an infinite delay
-        self.delay_vector = list(float_range(0, PDF_AND_DAP_DURATION, PDF_AND_DAP_RESOLUTION)) + [float('inf')]
-        self.delay_pdf_vector = [0] * len(self.delay_vector)
+        self.delay_vector = grid.edges
+        self._counts = np.zeros(len(self.delay_vector), dtype=np.int64)
         self._number_of_samples = 0
+        self._delay_pdf_vector = None
 
     def update_with_new_sample(self, sample: float) -> None:
         """Updates the delay pdf information with a new sample."""
-        old_number_of_samples = self._number_of_samples
+        self._counts[self.grid.index(sample)] += 1
         self._number_of_samples += 1
-        index = find_index_of_delay(sample, self.delay_vector)
-        if self._number_of_samples == 1:
-            self.delay_pdf_vector[index] = 1
-            return
-        denormalized_pdf = multiply_vector(self.delay_pdf_vector, old_number_of_samples)
-        denormalized_pdf[index] += 1
-        normalized_pdf = divide_vector(denormalized_pdf, self._number_of_samples)
-        self.delay_pdf_vector = normalized_pdf
+        self._delay_pdf_vector = None
+
+    @property
+    def delay_pdf_vector(self) -> np.ndarray:
+        """Returns the normalized delay pdf (read-only)."""
+        if self._delay_pdf_vector is None:
+            if self._number_of_samples == 0:
+                delay_pdf_vector = np.zeros(len(self._counts))
+            else:
+                delay_pdf_vector = self._counts / self._number_of_samples
+            delay_pdf_vector.flags.writeable = False
+            self._delay_pdf_vector = delay_pdf_vector
+        return self._delay_pdf_vector
+
+    @property
+    def number_of_samples(self) -> int:
+        """Returns the number of samples used to estimate the pdf."""
+        return self._number_of_samples
 
     def __len__(self):
         return len(self.delay_vector)
@@ -55,9 +85,10 @@ class DelayPDF:
 class DAP:
     """DAP object."""
 
-    def __init__(self, dap_vector: list = None, sink: bool = False) -> None:
-        self.deadline_vector = list(float_range(0, PDF_AND_DAP_DURATION, PDF_AND_DAP_RESOLUTION)) + [float('inf')]
-        if dap_vector:
+    def __init__(self, dap_vector: list = None, sink: bool = False, grid: TimeGrid = DEFAULT_TIME_GRID) -> None:
+        self.grid = grid
+        self.deadline_vector = grid.edges
+        if dap_vector is not None:
             self.dap_vector = dap_vector
         else:
             if sink:
@@ -70,12 +101,7 @@ class DAP:
         """Returns the DAP for a given deadline."""
         if deadline <= 0:
             return 0
-        index = find_index_of_delay(deadline, self.deadline_vector)
-        return self.dap_vector[index]
-
-    def vector_to_text(self) -> str:
-        """"Returns the text version of the DAP vector."""
-        return str(self.dap_vector).replace(',', '|')
+        return self.dap_vector[self.grid.index(deadline)]
 
     def __len__(self):
         return len(self.deadline_vector)
@@ -87,28 +113,50 @@ class DAP:
 
 
 class Neighbour:
-    """Definition of a neighbour in the context of DAP routing."""
+    """Definition of a neighbour in the context of DAP routing.
 
-    def __init__(self, address: str):
+    The DAP through the neighbour is only convolved when it is queried and
+    the link delay pdf or the neighbour DAP changed since the last time.
+    Every change is notified with the address to 'on_change', if given.
+    """
+
+    def __init__(self, address: str, grid: TimeGrid = DEFAULT_TIME_GRID,
+                 on_change: Optional[Callable[[str], None]] = None):
         self.address = address
-        self.link_delay_pdf = DelayPDF()
-        self.dap = DAP()
-        self.dap_through_neighbour = DAP()
+        self.grid = grid
+        self._on_change = on_change
+        self.link_delay_pdf = DelayPDF(grid)
+        self.dap = DAP(grid=grid)
+        self._dap_through_neighbour = DAP(grid=grid)
+        self._link_delay_pdf_changed = False
+        self._dap_changed = False
 
     def update_link_delay_pdf(self, sample: float) -> None:
         """Updates the delay pdf with a new delay sample."""
         self.link_delay_pdf.update_with_new_sample(sample)
-
-    def update_dap(self, new_dap: str) -> None:
-        """Updates the neighbour DAP."""
-        new_dap = new_dap.strip('[]').split('|')
-        new_dap = [float(dap) for dap in new_dap]
-        self.dap = DAP(new_dap)
-        self.update_dap_through_neighbour()
+        self._link_delay_pdf_changed = True
+        if self._on_change is not None:
+            self._on_change(self.address)
+
+    def update_dap(self, new_dap: np.ndarray) -> None:
+        """Updates the neighbour DAP with a decoded advertisement (not modified afterwards)."""
+        self.dap = DAP(new_dap, grid=self.grid)
+        self._dap_changed = True
+        if self._on_change is not None:
+            self._on_change(self.address)
+
+    @property
+    def dap_through_neighbour(self) -> DAP:
+        """Returns the DAP through the neighbour, convolved again only if it is outdated."""
+        if self._link_delay_pdf_changed or self._dap_changed:
+            self.update_dap_through_neighbour()
+        return self._dap_through_neighbour
 
     def update_dap_through_neighbour(self) -> None:
         """Updates the DAP though neighbour"""
-        self.dap_through_neighbour = convolution_of_dap_with_delay_pdf(self.dap, self.link_delay_pdf)
+        self._dap_through_neighbour = convolution_of_dap_with_delay_pdf(self.dap, self.link_delay_pdf)
+        self._link_delay_pdf_changed = False
+        self._dap_changed = False
 
     def get_dap_through_neighbour(self, deadline: float) -> float:
         """Returns the DAP through this neighbour for a given deadline."""
@@ -130,36 +178,58 @@ class Neighbour:
 class _DAPRouting(RoutingProtocol):
     """Implements methods used in DAP for both sink and sensing nodes."""
     _neighbours: Dict[str, Neighbour]
-    deadline: float
     dap_share_period = 60*60  # Time between messages sharing the own DAP
+    dap_encoding = 'float32'  # Of the DAP advertisements, one of DAP_ENCODINGS
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 time_grid: TimeGrid = DEFAULT_TIME_GRID,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
+        self._time_grid = time_grid  # Bins of the delay pdfs and DAPs
         self._neighbours = dict()
-
-    def add_to_output_queue(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+        # DAP through every neighbour (rows, in the order of _neighbours) for every deadline bin (columns).
+        # The rows are allocated in advance and their number doubles when they are all used
+        self._dap_matrix = np.zeros((INITIAL_NEIGHBOUR_ROWS, len(time_grid)))
+        self._neighbour_rows: Dict[str, int] = dict()
+        # Neighbours whose row is refreshed the next time the matrix is used
+        self._outdated_rows = set()
+        # Best next hops for every deadline bin, built again when a DAP through a neighbour changes
+        self._best_next_hops: Optional[List[List[str]]] = None
+
+    def warm_start(self, neighbours_daps: Dict[str, Iterable[float]], link_delays: Dict[str, Iterable[float]]) -> None:
+        """Adds the neighbours with their converged DAPs and link delay samples, see convergence.py.
+
+        The DAPs go through the encoding of the advertisements, as if they were received.
+        """
+        for address, dap_vector in neighbours_daps.items():
+            neighbour = self._neighbours.get(address)
+            if neighbour is None:
+                neighbour = self._add_neighbour(address)
+            for delay in link_delays[address]:
+                neighbour.update_link_delay_pdf(delay)
+            neighbour.update_dap(decode_dap(encode_dap(dap_vector, self.dap_encoding)))
+
+    def add_to_output_queue(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Adds a message to the output queue."""
-        self._log_output_queue_message(message, destination)
+        self._log_output_queue_message(packet, destination)
         with self._output_queue.request() as req:
             yield req
-            yield self.env.process(self._send_packet(message, destination))
+            yield self.env.process(self._send_packet(packet, destination))
 
-    def _send_packet(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def _send_packet(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Method to send a message to a destination."""
         prove_packet = destination not in ['', 'broadcast', 'sink']
-        if is_hello_message(message) or is_dap_message(message):
-            measurement_time = 0
-        else:
-            _, _, measurement_time = parse_payload(message)
-        time_to_deadline = self.deadline - (self.env.now - measurement_time)
+        # Only data packets have a measurement time, it is 0 for the rest
+        time_to_deadline = self.deadline - (self.env.now - packet.timestamp)
         next_hop_address = self._choose_next_hop_address(destination, time_to_deadline)
         if next_hop_address is None:
             raise Exception('No next hop address was returned to route·')
-        data = '{},{},{}'.format(self.address, next_hop_address, message)
-        self._print_info(f'sending: {data}')
+        data = packet.for_hop(self.address, next_hop_address)
+        if self._trace_level >= TraceLevel.PACKET and data.kind in self.tracer.kinds:
+            self._trace(f'sending: {data}')
         self._log_message_sending(data, destination)
         if prove_packet:
             start_time = self.env.now
@@ -171,12 +241,44 @@ class _DAPRouting(RoutingProtocol):
             yield self.env.process(self._radio(data))
         self._log_message_sent(data, destination)
 
-    def _analyze_hello_message(self, origin_address: str) -> None:
+    def _analyze_hello_message(self, packet: Packet) -> None:
         """Checks information of Hello message."""
-        new_neighbour = Neighbour(origin_address)
-        if new_neighbour.address not in self._neighbours:
-            self._neighbours[new_neighbour.address] = new_neighbour
-            self.env.process(self.add_to_output_queue(f'Hello', 'broadcast'))
+        if packet.origin not in self._neighbours:
+            self._add_neighbour(packet.origin)
+            self.env.process(self.add_to_output_queue(Packet(PacketKind.HELLO), 'broadcast'))
+
+    def _add_neighbour(self, address: str) -> Neighbour:
+        """Adds a new neighbour, whose changes mark its row of the matrix as outdated."""
+        neighbour = Neighbour(address, self._time_grid, self._mark_row_as_outdated)
+        self._neighbours[address] = neighbour
+        row = len(self._neighbour_rows)
+        if row == len(self._dap_matrix):
+            grown_matrix = np.zeros((2 * len(self._dap_matrix), self._dap_matrix.shape[1]))
+            grown_matrix[:row] = self._dap_matrix
+            self._dap_matrix = grown_matrix
+        self._neighbour_rows[address] = row
+        self._dap_matrix[row] = neighbour.dap_through_neighbour.dap_vector
+        self._best_next_hops = None
+        return neighbour
+
+    def _mark_row_as_outdated(self, address: str) -> None:
+        """Marks the DAP through a neighbour as changed."""
+        self._outdated_rows.add(address)
+        self._best_next_hops = None
+
+    @property
+    def time_grid(self) -> TimeGrid:
+        """Returns the bins of the delay pdfs and DAPs."""
+        return self._time_grid
+
+    @property
+    def dap_matrix(self) -> np.ndarray:
+        """Returns the DAP through every neighbour (neighbours x deadline bins)."""
+        for address in self._outdated_rows:
+            row = self._neighbour_rows[address]
+            self._dap_matrix[row] = self._neighbours[address].dap_through_neighbour.dap_vector
+        self._outdated_rows.clear()
+        return self._dap_matrix[:len(self._neighbour_rows)]
 
     def _choose_next_hop_address(self, destination: str, time_to_deadline: float) -> Optional[str]:
         """Returns one nodes to route data."""
@@ -185,20 +287,25 @@ class _DAPRouting(RoutingProtocol):
         elif destination in self._neighbours:
             return destination
         elif destination == 'sink':
-            max_dap_address = _find_max_dap_neighbour(self._neighbours, time_to_deadline)
+            max_dap_address = self._find_max_dap_neighbour(time_to_deadline)
             return max_dap_address
         return None
 
+    def _find_max_dap_neighbour(self, time_to_deadline: float) -> str:
+        """Returns the address of the selected forwarder with maximum DAP toward the sink."""
+        if time_to_deadline <= 0:
+            # The DAP through every neighbour is 0
+            return self._random.choice(list(self._neighbours))
+        if self._best_next_hops is None:
+            self._best_next_hops = _build_best_next_hops(self.dap_matrix, list(self._neighbours))
+        return self._random.choice(self._best_next_hops[self._time_grid.index(time_to_deadline)])
 
-def _find_max_dap_neighbour(neighbours_dict: Dict[str, Neighbour], time_to_deadline: float) -> str:
-    """Returns the address of the selected forwarder with minimum Max DAP toward the sink."""
-    neighbours = neighbours_dict.values()
-    max_dap_through_neighbour = max({neighbour.get_dap_through_neighbour(time_to_deadline) for neighbour in neighbours})
-    # '<=' added instead of '==' for floating point arithmetic compatibility
-    max_dap_neighbours = [n for n in neighbours if
-                          n.get_dap_through_neighbour(time_to_deadline) >= max_dap_through_neighbour]
-    neighbour_selected = choice(max_dap_neighbours)
-    return neighbour_selected.address
+
+def _build_best_next_hops(dap_matrix: np.ndarray, addresses: List[str]) -> List[List[str]]:
+    """Returns, for every deadline bin, the neighbours with maximum DAP through them."""
+    # '>=' instead of '==' for floating point arithmetic compatibility
+    is_best = dap_matrix >= dap_matrix.max(axis=0)
+    return [[addresses[row] for row in np.flatnonzero(column)] for column in is_best.T]
 
 
 class DAPRouting(_DAPRouting):
@@ -207,41 +314,48 @@ class DAPRouting(_DAPRouting):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
-        self.dap = DAP()
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
+        self.dap = DAP(grid=self._time_grid)
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.DAP: self._analyze_dap_message,
+            PacketKind.PROBE: self._ignore_packet,
+            PacketKind.DATA: self._forward_data_packet,
+        }
 
     def active_link_probing(self) -> Generator[Event, Any, Any]:
         """Routine to actively probe the links with dummy packets."""
         yield self.env.timeout(1)
         probe_per_hour = self.probe_packet_rate*len(self._neighbours)
         probe_period = 60*60/probe_per_hour
-        message = "DAP+dummy"
         # Fist probe to every neighbour
         for address in self._neighbours:
-            self.env.process(self.add_to_output_queue(message, address))
+            self.env.process(self.add_to_output_queue(Packet(PacketKind.PROBE), address))
         # Probes are sent periodically
         while True:
             for address, neighbour in self._neighbours.items():
                 yield self.env.timeout(probe_period)
-                self.env.process(self.add_to_output_queue(message, address))
+                self.env.process(self.add_to_output_queue(Packet(PacketKind.PROBE), address))
+
+    def warm_start(self, neighbours_daps: Dict[str, Iterable[float]], link_delays: Dict[str, Iterable[float]]) -> None:
+        """Adds the converged neighbours and updates the own DAP."""
+        super().warm_start(neighbours_daps, link_delays)
+        self.update_dap()
 
     def update_dap(self) -> None:
         """Updates the own DAP."""
-        neighbours = self._neighbours.values()
-        for index in range(len(self.dap)):
-            dap_through_neighbours = {neighbour.dap_through_neighbour.dap_vector[index]
-                                      for neighbour in neighbours}
-            self.dap.dap_vector[index] = max(dap_through_neighbours)
+        self.dap.dap_vector = self.dap_matrix.max(axis=0).tolist()
 
     def share_dap(self) -> Generator[Event, Any, Any]:
         """Routine to share the own DAP periodically."""
         yield self.env.timeout(60)  # wait for a minute before share the DAP
         while True:
             self.update_dap()
-            message = f"DAP+{self.dap.vector_to_text()}"
-            self.env.process(self.add_to_output_queue(message, "broadcast"))
+            packet = Packet(PacketKind.DAP, encode_dap(self.dap.dap_vector, self.dap_encoding))
+            self.env.process(self.add_to_output_queue(packet, "broadcast"))
             yield self.env.timeout(self.dap_share_period)
 
     def setup(self) -> Generator[Event, Any, Any]:
@@ -251,29 +365,9 @@ class DAPRouting(_DAPRouting):
         # noinspection PyArgumentEqualDefault
         yield self.env.timeout(0)
 
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message}')
-        origin_address, destination_address, info = \
-            get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if is_hello_message(info):
-            # It is a hello message
-            self._analyze_hello_message(origin_address)
-        elif is_dap_message(info):
-            # It is a dap message
-            self._analyze_dap_message(origin_address, info)
-        else:
-            # It is not a hello message, so it should be forwarded
-            self.env.process(self.add_to_output_queue(info, 'sink'))
-            return
-
-    def _analyze_dap_message(self, origin_address: str, info: str) -> None:
-        """Updates the neighbour information with a new DAP or discard if it is a dummy packet."""
-        if "dummy" not in info:
-            new_dap = info.split('+')[1]
-            self._neighbours[origin_address].update_dap(new_dap)
+    def _analyze_dap_message(self, packet: Packet) -> None:
+        """Updates the neighbour information with a new DAP."""
+        self._neighbours[packet.origin].update_dap(decode_dap(packet.value))
 
 
 class DAPRoutingSink(_DAPRouting):
@@ -281,60 +375,79 @@ class DAPRoutingSink(_DAPRouting):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
-        self.dap = DAP(sink=True)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
+        self.dap = DAP(sink=True, grid=self._time_grid)
+        # The sink does nothing with DAP messages
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.DAP: self._ignore_packet,
+            PacketKind.PROBE: self._ignore_packet,
+            PacketKind.DATA: self._receive_data_packet,
+        }
 
     def share_dap(self) -> Generator[Event, Any, Any]:
         """Routine to share the own DAP periodically."""
         while True:
-            message = f"DAP+{self.dap.vector_to_text()}"
-            self.env.process(self.add_to_output_queue(message, "broadcast"))
+            packet = Packet(PacketKind.DAP, encode_dap(self.dap.dap_vector, self.dap_encoding))
+            self.env.process(self.add_to_output_queue(packet, "broadcast"))
             yield self.env.timeout(self.dap_share_period)
 
     def setup(self) -> None:
         """Initiates the neighbours discovery with hop count."""
-        yield self.env.process(self.add_to_output_queue(f'Hello', 'broadcast'))
+        yield self.env.process(self.add_to_output_queue(Packet(PacketKind.HELLO), 'broadcast'))
         self.env.process(self.share_dap())
 
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message[:200]}')
-        origin_address, destination_address, info = \
-            get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if is_hello_message(info):
-            # It is a hello message
-            self._analyze_hello_message(origin_address)
-        elif is_dap_message(info):
-            # It is a DAP message the sink does nothing
-            pass
-        else:
-            # It is not a hello message, so it reached the sink node
-            self._print_info(f'message: {info} reached sink node')
-
 
 def convolution_of_dap_with_delay_pdf(dap: DAP, delay_pdf: DelayPDF) -> DAP:
-    """Convolve a DAP with a DelayPDF in order to generate a new DAP."""
-    dap_vector = dap.dap_vector
+    """Convolve a DAP with a DelayPDF in order to generate a new DAP.
+
+    Every probability that falls beyond the last deadline is added to the
+    last entry, which represents an infinite deadline. In a non-uniform grid
+    every product is added to the bin of the sum of both edges.
+    """
+    dap_vector = np.asarray(dap.dap_vector, dtype=float)
     dap_length = len(dap_vector)
 
     delay_vector = delay_pdf.delay_pdf_vector
     delay_length = len(delay_vector)
 
-    assert dap_length == delay_length
-    new_dap = [0.0]*dap_length
-
-    for delay_index, delay_value in enumerate(delay_vector):
-        for dap_index, dap_value in enumerate(dap_vector):
-            new_dap_index = delay_index + dap_index
-            new_dap_probability = delay_value*dap_value
-            if new_dap_index < dap_length - 1:
-                new_dap[new_dap_index] += new_dap_probability
-            else:
-                new_dap[-1] += new_dap_probability
+    assert dap_length == delay_length and dap.grid == delay_pdf.grid
+    grid = dap.grid
+    if grid.resolution is not None:
+        full_convolution = np.convolve(delay_vector, dap_vector)
+        new_dap = full_convolution[:dap_length]
+        new_dap[-1] = full_convolution[dap_length - 1:].sum()
+    else:
+        products = np.outer(delay_vector, dap_vector)
+        new_dap = np.bincount(grid.sum_indexes.ravel(), weights=products.ravel(), minlength=dap_length)
     if new_dap[-1] > 1:
         new_dap[-1] = 1.0
-    return DAP(new_dap)
+    return DAP(new_dap.tolist(), grid=grid)
+
+
+def encode_dap(dap_vector: Iterable[float], encoding: str = 'float32') -> bytes:
+    """Returns the payload of a DAP advertisement: the encoding tag and the vector, see DAP_ENCODINGS."""
+    dtype = DAP_ENCODINGS[encoding]
+    dap_vector = np.asarray(dap_vector, dtype=float)
+    if encoding == 'uint16':
+        dap_vector = np.rint(np.clip(dap_vector, 0, 1) * DAP_QUANTIZATION_LEVELS)
+    return bytes((_ENCODING_TAGS[encoding],)) + dap_vector.astype(dtype).tobytes()
+
+
+def decode_dap(payload: bytes) -> np.ndarray:
+    """Returns the DAP vector of an advertisement payload (read-only), in the encoding of its tag.
+
+    Floating point encodings are decoded without copying the payload.
+    """
+    try:
+        encoding = _TAG_ENCODINGS[payload[0]]
+    except IndexError:
+        raise ValueError(f'{payload[:1]!r} is not the tag of a DAP encoding') from None
+    dap_vector = np.frombuffer(payload, dtype=DAP_ENCODINGS[encoding], offset=1)
+    if encoding == 'uint16':
+        dap_vector = dap_vector / DAP_QUANTIZATION_LEVELS
+        dap_vector.flags.writeable = False
+    return dap_vector
@@ -8,51 +8,47 @@ ETX:
 the own etx to min(total_etx) and sharing again...
 """
 
-from typing import Callable, Generator, Any, Optional, Dict
-from random import choice
-from statistics import mean
+from typing import Callable, Generator, Any, Optional, Dict, Iterable
 
 from simpy import Environment, Event
 
 from .base_routing_protocol import RoutingProtocol
-from ..auxiliary_functions import get_components_of_message, is_hello_message, is_etx_message
+from .best_neighbours import BestNeighbours
+from ..tracing import TraceLevel
+from ..packet import Packet, PacketKind
+from ..link_estimator import LinkEstimator, DEFAULT_LINK_ESTIMATOR
 
 
 class Neighbour:
     """Definition of a neighbour in the context of ETX routing."""
 
-    def __init__(self, address: str, etx: float = 999999) -> None:
+    def __init__(self, address: str, etx: float = 999999,
+                 link_estimator: LinkEstimator = DEFAULT_LINK_ESTIMATOR) -> None:
         self.address = address
         self.etx = etx
-        self.link_etx = []
+        # Estimation of the mean link delay, None until the first sample
+        self.link_etx = link_estimator.new()
         self.total_etx = etx  # = etx + link_etx
 
     def update_etx(self, etx: float) -> None:
         """Updates the etx and total_etx attributes."""
         self.etx = etx
-        if self.link_etx:
-            self.total_etx = etx + mean(self.link_etx)
+        link_etx = self.link_etx.value
+        if link_etx is not None:
+            self.total_etx = etx + link_etx
         else:
             self.total_etx = etx
 
     def update_link_etx(self, link_etx: float) -> None:
         """Updates the link_etx and total_etx attributes."""
-        self.link_etx.append(link_etx)
-        self.total_etx = self.etx + mean(self.link_etx)
+        self.link_etx.update(link_etx)
+        self.total_etx = self.etx + self.link_etx.value
 
     def __repr__(self):
-        link_etx = None
-        if self.link_etx:
-            link_etx = mean(self.link_etx)
         return f'(Address: {self.address}, ETX: {self.etx}, ' \
-               f'Link ETX: {link_etx}, Total ETX: {self.total_etx})'
+               f'Link ETX: {self.link_etx.value}, Total ETX: {self.total_etx})'
 
-    def __str__(self):
-        link_etx = None
-        if self.link_etx:
-            link_etx = mean(self.link_etx)
-        return f'(Address: {self.address}, ETX: {self.etx}, ' \
-               f'Link ETX: {link_etx}, Total ETX: {self.total_etx})'
+    __str__ = __repr__
 
     def __eq__(self, other):
         return other.address == self.address
@@ -61,18 +57,6 @@ class Neighbour:
         return hash(self.address)
 
 
-def _find_min_etx_neighbour(neighbours_dict: Dict[str, Neighbour]) -> str:
-    """Returns the address of the selected forwarder with minimum ETX toward
-    the sink."""
-    neighbours = neighbours_dict.values()
-    min_total_etx = min({neighbour.total_etx for neighbour in neighbours})
-    # '<=' added instead of '==' for floating point arithmetic compatibility
-    min_etx_neighbours = [n for n in neighbours
-                          if n.total_etx <= min_total_etx]
-    neighbour_selected = choice(min_etx_neighbours)
-    return neighbour_selected.address
-
-
 class _ETX(RoutingProtocol):
     """Implements methods used in ETX for both sink and sensing nodes."""
     _neighbours: Dict[str, Neighbour]
@@ -80,51 +64,69 @@ class _ETX(RoutingProtocol):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 link_estimator: LinkEstimator = DEFAULT_LINK_ESTIMATOR,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
+        self._link_estimator = link_estimator  # Of the mean delay of every link
         self.etx = 999999
         self._neighbours = dict()
-
-    def add_to_output_queue(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+        # Neighbours with minimum ETX toward the sink, updated with every probe and ETX received
+        self._min_etx_neighbours = BestNeighbours()
+
+    def warm_start(self, neighbours_etx: Dict[str, float], link_delays: Dict[str, Iterable[float]]) -> None:
+        """Adds the neighbours with their converged ETX and link delay samples, see convergence.py."""
+        for address, etx in neighbours_etx.items():
+            neighbour = Neighbour(address, etx, self._link_estimator)
+            for delay in link_delays[address]:
+                neighbour.update_link_etx(delay)
+            self._neighbours[address] = neighbour
+            self._min_etx_neighbours.update(address, neighbour.total_etx)
+
+    def add_to_output_queue(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Adds a message to the output queue."""
-        self._log_output_queue_message(message, destination)
+        self._log_output_queue_message(packet, destination)
         with self._output_queue.request() as req:
             yield req
-            yield self.env.process(self._send_packet(message, destination))
+            yield self.env.process(self._send_packet(packet, destination))
 
-    def _send_packet(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def _send_packet(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Method to send a message to a destination."""
         prove_packet = destination not in ['', 'broadcast', 'sink']
         next_hop_address = self._choose_next_hop_address(destination)
         if next_hop_address is None:
             raise Exception('No next hop address was returned to route·')
-        data = '{},{},{}'.format(self.address, next_hop_address, message)
-        self._print_info(f'sending: {data}')
+        data = packet.for_hop(self.address, next_hop_address)
+        if self._trace_level >= TraceLevel.PACKET and data.kind in self.tracer.kinds:
+            self._trace(f'sending: {data}')
         self._log_message_sending(data, destination)
         if prove_packet:
             start_time = self.env.now
             yield self.env.process(self._radio(data))
             end_time = self.env.now
             delay = end_time - start_time
-            self._neighbours[destination].update_link_etx(delay)
+            neighbour = self._neighbours[destination]
+            neighbour.update_link_etx(delay)
+            self._min_etx_neighbours.update(destination, neighbour.total_etx)
         else:
             yield self.env.process(self._radio(data))
         self._log_message_sent(data, destination)
 
-    def _analyze_hello_message(self, origin_address: str) -> None:
+    def _analyze_hello_message(self, packet: Packet) -> None:
         """Checks information of Hello message."""
-        new_neighbour = Neighbour(origin_address)
+        new_neighbour = Neighbour(packet.origin, link_estimator=self._link_estimator)
         if new_neighbour.address not in self._neighbours:
             self._neighbours[new_neighbour.address] = new_neighbour
-            self.env.process(self.add_to_output_queue(f'Hello', 'broadcast'))
+            self._min_etx_neighbours.update(new_neighbour.address, new_neighbour.total_etx)
+            self.env.process(self.add_to_output_queue(Packet(PacketKind.HELLO), 'broadcast'))
 
     def _choose_next_hop_address(self, destination: str) -> Optional[str]:
         """Returns one nodes to route data."""
         if destination == 'broadcast' or destination == '':
             return ''
         elif destination == 'sink':
-            min_etx_address = _find_min_etx_neighbour(self._neighbours)
+            min_etx_address = self._random.choice(self._min_etx_neighbours.addresses())
             return min_etx_address
         elif destination in self._neighbours:
             return destination
@@ -137,24 +139,35 @@ class ETX(_ETX):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.ETX: self._analyze_etx_message,
+            PacketKind.PROBE: self._ignore_packet,
+            PacketKind.DATA: self._forward_data_packet,
+        }
 
     def active_link_probing(self) -> Generator[Event, Any, Any]:
         """Routine to actively probe the links with dummy packets."""
         yield self.env.timeout(1)
         probe_per_hour = self.probe_packet_rate*len(self._neighbours)
         probe_period = 60*60/probe_per_hour
-        message = "ETX+dummy"
         # Fist probe to every neighbour
         for address in self._neighbours:
-            self.env.process(self.add_to_output_queue(message, address))
+            self.env.process(self.add_to_output_queue(Packet(PacketKind.PROBE), address))
         # Probes are sent periodically
         while True:
             for address, neighbour in self._neighbours.items():
                 yield self.env.timeout(probe_period)
-                self.env.process(self.add_to_output_queue(message, address))
+                self.env.process(self.add_to_output_queue(Packet(PacketKind.PROBE), address))
+
+    def warm_start(self, neighbours_etx: Dict[str, float], link_delays: Dict[str, Iterable[float]]) -> None:
+        """Adds the converged neighbours and updates the own ETX."""
+        super().warm_start(neighbours_etx, link_delays)
+        self.update_etx()
 
     def update_etx(self) -> None:
         """Updates the ETX count."""
@@ -167,8 +180,8 @@ class ETX(_ETX):
         yield self.env.timeout(60)  # wait for a minute before share the ETX
         while True:
             self.update_etx()
-            message = f"ETX+{self.etx}"
-            self.env.process(self.add_to_output_queue(message, "broadcast"))
+            packet = Packet(PacketKind.ETX, self.etx)
+            self.env.process(self.add_to_output_queue(packet, "broadcast"))
             yield self.env.timeout(self.etx_share_period)
 
     def setup(self) -> Generator[Event, Any, Any]:
@@ -178,29 +191,11 @@ class ETX(_ETX):
         # noinspection PyArgumentEqualDefault
         yield self.env.timeout(0)
 
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message}')
-        origin_address, destination_address, info = get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if is_hello_message(info):
-            # It is a hello message
-            self._analyze_hello_message(origin_address)
-        elif is_etx_message(info):
-            # It is a etx message
-            self._analyze_etx_message(origin_address, info)
-        else:
-            # It is not a hello message, so it should be forwarded
-            self.env.process(self.add_to_output_queue(info, 'sink'))
-            return
-
-    def _analyze_etx_message(self, origin_address: str, info: str) -> None:
-        """Updates the neighbour information with a new ETX or discard if it is
-         a dummy packet."""
-        if "dummy" not in info:
-            new_etx = float(info.split('+')[1])
-            self._neighbours[origin_address].update_etx(new_etx)
+    def _analyze_etx_message(self, packet: Packet) -> None:
+        """Updates the neighbour information with a new ETX."""
+        neighbour = self._neighbours[packet.origin]
+        neighbour.update_etx(packet.value)
+        self._min_etx_neighbours.update(packet.origin, neighbour.total_etx)
 
 
 class ETXSink(_ETX):
@@ -208,36 +203,27 @@ class ETXSink(_ETX):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
         self.etx = 0
+        # The sink does nothing with ETX messages
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.ETX: self._ignore_packet,
+            PacketKind.PROBE: self._ignore_packet,
+            PacketKind.DATA: self._receive_data_packet,
+        }
 
     def share_etx(self) -> Generator[Event, Any, Any]:
         """Routine to share the own ETX periodically."""
         while True:
-            message = f"ETX+{self.etx}"
-            self.env.process(self.add_to_output_queue(message, "broadcast"))
+            packet = Packet(PacketKind.ETX, self.etx)
+            self.env.process(self.add_to_output_queue(packet, "broadcast"))
             yield self.env.timeout(self.etx_share_period)
 
     def setup(self) -> None:
         """Initiates the neighbours discovery."""
-        yield self.env.process(self.add_to_output_queue(f'Hello', 'broadcast'))
+        yield self.env.process(self.add_to_output_queue(Packet(PacketKind.HELLO), 'broadcast'))
         self.env.process(self.share_etx())
-
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message}')
-        origin_address, destination_address, info = \
-            get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if is_hello_message(info):
-            # It is a hello message
-            self._analyze_hello_message(origin_address)
-        elif is_etx_message(info):
-            # It is a etx message the sink does nothing
-            pass
-        else:
-            # It is not a hello message, so it reached the sink node
-            self._print_info(f'message: {info} reached sink node')
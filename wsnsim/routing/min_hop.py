@@ -1,12 +1,13 @@
 """Implements min-hop routing protocol/metric."""
 
 from typing import Callable, Generator, Any, Optional, Dict
-from random import choice
 
 from simpy import Environment, Event
 
-from ..auxiliary_functions import get_components_of_message, is_hello_message
+from ..packet import Packet, PacketKind
 from .base_routing_protocol import RoutingProtocol
+from .best_neighbours import BestNeighbours
+from ..tracing import TraceLevel
 
 
 class Neighbour:
@@ -34,25 +35,19 @@ class Neighbour:
         return hash(self.address)
 
 
-def _find_min_hop_neighbour(neighbours_dict: Dict[str, Neighbour]) -> str:
-    """Returns the address of the selected forwarder with min-hop to sink."""
-    neighbours = neighbours_dict.values()
-    min_hop = min({neighbour.hop_count for neighbour in neighbours})
-    min_hop_neighbours = [n for n in neighbours if n.hop_count == min_hop]
-    neighbour_selected = choice(min_hop_neighbours)
-    return neighbour_selected.address
-
-
 class _MinHopRouting(RoutingProtocol):
     """Private base class for the min-hop routing."""
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
         self.hop_count = 9999999
         self._neighbours = dict()
+        # Neighbours with min-hop to sink, updated with every hop count received
+        self._min_hop_neighbours = BestNeighbours()
 
     def update_hop_count(self, hop_count: int) -> bool:
         """Updates the node hop count, adding 1 to the neighbour count."""
@@ -62,33 +57,43 @@ class _MinHopRouting(RoutingProtocol):
             return True
         return False
 
-    def add_to_output_queue(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def warm_start(self, neighbours_hop_counts: Dict[str, int]) -> None:
+        """Adds the neighbours with their converged hop counts, see convergence.py."""
+        for address, hop_count in neighbours_hop_counts.items():
+            self._neighbours[address] = Neighbour(address, hop_count)
+            self._min_hop_neighbours.update(address, hop_count)
+            self.update_hop_count(hop_count)
+
+    def add_to_output_queue(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Adds a message to the output queue."""
-        self._log_output_queue_message(message, destination)
+        self._log_output_queue_message(packet, destination)
         with self._output_queue.request() as req:
             yield req
-            yield self.env.process(self._send_packet(message, destination))
+            yield self.env.process(self._send_packet(packet, destination))
 
-    def _send_packet(self, message: str, destination: str) -> Generator[Event, Any, Any]:
+    def _send_packet(self, packet: Packet, destination: str) -> Generator[Event, Any, Any]:
         """Method to send a message to a destination."""
         next_hop_address = self._choose_next_hop_address(destination)
         if next_hop_address is None:
             raise Exception('No next-hop address was returned to route·')
-        data = '{},{},{}'.format(self.address, next_hop_address, message)
-        self._print_info(f'sending: {data}')
+        data = packet.for_hop(self.address, next_hop_address)
+        if self._trace_level >= TraceLevel.PACKET and data.kind in self.tracer.kinds:
+            self._trace(f'sending: {data}')
         self._log_message_sending(data, destination)
         yield self.env.process(self._radio(data))
         self._log_message_sent(data, destination)
 
-    def _analyze_hello_message(self, info: str, origin_address: str) -> None:
+    def _analyze_hello_message(self, packet: Packet) -> None:
         """Checks information of Hello message."""
-        new_neighbour_hop_count = int(info.split('+')[1])
+        origin_address = packet.origin
+        new_neighbour_hop_count = packet.value
         new_neighbour = Neighbour(origin_address, new_neighbour_hop_count)
         if new_neighbour.address not in self._neighbours:
             self._neighbours[new_neighbour.address] = new_neighbour
+            self._min_hop_neighbours.update(new_neighbour.address, new_neighbour_hop_count)
             self.update_hop_count(new_neighbour_hop_count)
             self.env.process(self.add_to_output_queue(
-                f'Hello+{self.hop_count}', 'broadcast'))
+                Packet(PacketKind.HELLO, self.hop_count), 'broadcast'))
             return
         # In case the neighbour exists, check if the hop count is the same
         # if it is the same, nothing must be done, if it is different, must
@@ -97,20 +102,22 @@ class _MinHopRouting(RoutingProtocol):
         old_version_neighbour = self._neighbours[new_neighbour.address]
         if old_version_neighbour.hop_count != new_neighbour.hop_count:
             self._neighbours[new_neighbour.address] = new_neighbour
-            self._print_info(f'Node {origin_address} is updated neighbour with'
-                             f'hop count {new_neighbour_hop_count}')
+            self._min_hop_neighbours.update(new_neighbour.address, new_neighbour_hop_count)
+            if self._trace_level >= TraceLevel.INFO and PacketKind.HELLO in self.tracer.kinds:
+                self._trace(f'Node {origin_address} is updated neighbour with'
+                            f'hop count {new_neighbour_hop_count}')
             new_value = self.update_hop_count(new_neighbour_hop_count)
             if new_value:
                 # Share new hop count
                 self.env.process(self.add_to_output_queue(
-                    f'Hello+{self.hop_count}', 'broadcast'))
+                    Packet(PacketKind.HELLO, self.hop_count), 'broadcast'))
 
     def _choose_next_hop_address(self, destination: str) -> Optional[str]:
         """Returns one or a list of nodes to route data."""
         if destination == 'broadcast' or destination == '':
             return ''
         elif destination == 'sink':
-            min_hop_address = _find_min_hop_neighbour(self._neighbours)
+            min_hop_address = self._random.choice(self._min_hop_neighbours.addresses())
             return min_hop_address
         return None
 
@@ -120,56 +127,38 @@ class MinHopRouting(_MinHopRouting):
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
         self.hop_count = 99
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.DATA: self._forward_data_packet,
+        }
 
     def setup(self) -> Generator[Event, Any, Any]:
         """Void setup, added for generality of all routing protocols."""
         # noinspection PyArgumentEqualDefault
         yield self.env.timeout(0)
 
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message}')
-        origin_address, destination_address, info = \
-            get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if not is_hello_message(info):
-            # It is not a hello message, so it should be forwarded
-            self.env.process(self.add_to_output_queue(info, 'sink'))
-            return
-        # It is a hello message
-        self._analyze_hello_message(info, origin_address)
-
 
 class MinHopRoutingSink(_MinHopRouting):
     """Class of min-hop routing protocol for sink node."""
 
     def __init__(self,
                  address: str,
-                 radio: Callable[[str], Generator[Event, Any, Any]],
-                 env: Environment) -> None:
-        super().__init__(address, radio, env)
+                 radio: Callable[[Packet], Generator[Event, Any, Any]],
+                 env: Environment,
+                 **options: Any) -> None:
+        super().__init__(address, radio, env, **options)
         self.hop_count = 0
+        self._packet_handlers = {
+            PacketKind.HELLO: self._analyze_hello_message,
+            PacketKind.DATA: self._receive_data_packet,
+        }
 
     def setup(self) -> Generator[Event, Any, Any]:
         """Initiates the neighbours discovery with hop count."""
         yield self.env.process(self.add_to_output_queue(
-            f'Hello+{self.hop_count}', 'broadcast'))
-
-    def receive_packet(self, message: str) -> None:
-        """Method called when a packet arrives."""
-        self._log_received_message(message)
-        self._print_info(f'received: {message}')
-        origin_address, destination_address, info = \
-            get_components_of_message(message)
-        assert destination_address == self.address or destination_address == ''
-        if not is_hello_message(info):
-            # It is not a hello message, so it reached the sink node
-            self._print_info(f'message: {info} reached sink node')
-            return
-        # It is a hello message
-        self._analyze_hello_message(info, origin_address)
+            Packet(PacketKind.HELLO, self.hop_count), 'broadcast'))
@@ -1,41 +1,135 @@
 """Simulation related code."""
 
 from random import seed
+from typing import Optional, Dict, Iterable
 
 from simpy import Environment
 
+from .convergence import warm_start, DEFAULT_SAMPLES_PER_LINK
 from .link import convert_to_simulation_links
+from .link_estimator import LinkEstimator, DEFAULT_LINK_ESTIMATOR
 from .medium import Medium
 
 from .network import Network, SimulationNetwork
-from .node import convert_to_simulation_nodes
-from .performance import NetworkPerformance
+from .node import convert_to_simulation_nodes, get_sink_node, SimulationSensingNode
+from .performance import NetworkPerformance, NodeReport, DEFAULT_QUANTILES
+from .recorder import Retention, EventLog
+from .stopping import dmr_precision
+from .time_grid import TimeGrid, DEFAULT_TIME_GRID
+from .trace_file import TraceSink
+from .tracing import Tracer, DISABLED_TRACER
 
 DEFAULT_SEED = 290696
+DEFAULT_CHECK_PERIOD = 24*60*60  # Simulated time between checks of the precision, in seconds
+DEFAULT_CONFIDENCE = 0.95
 
 
 class Simulation:
     """Manage a simulation."""
 
-    def __init__(self, network: Network, routing_protocol: str, deadline: float) -> None:
+    def __init__(self, network: Network, routing_protocol: str, deadline: float,
+                 log_retention: Optional[Dict[str, Retention]] = None,
+                 tracer: Optional[Tracer] = None,
+                 trace_sink: Optional[TraceSink] = None,
+                 time_grid: Optional[TimeGrid] = None,
+                 link_estimator: Optional[LinkEstimator] = None) -> None:
         self.env = Environment()
-        self.medium = Medium(self.env)
+        self.medium = Medium(self.env, trace_sink)
         send_data_function = self.medium.send_data_to_medium
+        # 'log_retention' sets how many events are kept in the 'received', 'output_queue',
+        # 'sending' and 'sent' logs of every node, e.g. {'sent': Retention.ring(1000)}
+        # 'tracer' shows what the nodes do, nothing is shown without a tracer
+        self.tracer = tracer if tracer is not None else DISABLED_TRACER
+        # 'trace_sink' streams every event to a file, use it with Retention.off() for long runs
+        self.trace_sink = trace_sink
+        # 'time_grid' sets the bins of the delay pdfs and DAPs of DAP routing,
+        # e.g. TimeGrid.uniform(resolution=0.5, duration=60)
+        self.time_grid = time_grid if time_grid is not None else DEFAULT_TIME_GRID
+        # 'link_estimator' sets how ETX estimates the mean delay of every link,
+        # e.g. LinkEstimator.ewma(alpha=0.1) or LinkEstimator.window(size=50)
+        self.link_estimator = link_estimator if link_estimator is not None else DEFAULT_LINK_ESTIMATOR
         simulation_nodes = convert_to_simulation_nodes(network.nodes,
                                                        routing_protocol,
                                                        deadline,
                                                        send_data_function,
-                                                       self.env)
+                                                       self.env,
+                                                       log_retention,
+                                                       self.tracer,
+                                                       trace_sink,
+                                                       self.time_grid,
+                                                       self.link_estimator)
         simulation_links = convert_to_simulation_links(network.links, simulation_nodes)
         self.medium.setup_links(simulation_links)
         self.network = SimulationNetwork(simulation_nodes, simulation_links)
         self.deadline = deadline
+        self.routing_protocol = routing_protocol
+        # Set by run() with a tolerance: end of the warm-up and half-width of the DMR of every node
+        self.warm_up_time = 0.0
+        self.dmr_half_widths: Dict[str, float] = {}
 
-    def run(self, time: float, seed_value: int = DEFAULT_SEED) -> None:
-        """Runs the simulation for a given time in seconds."""
-        seed(seed_value)  # Restart the seed
-        self.env.run(until=time)
+    def warm_start(self, samples_per_link: int = DEFAULT_SAMPLES_PER_LINK, seed_value: int = DEFAULT_SEED) -> None:
+        """Starts the routing protocols in their converged state, call it before run().
+
+        The state is computed offline from the topology and 'samples_per_link'
+        delay samples of every link, see convergence.py. The samples are drawn
+        from other streams than the delays of run() with the same seed.
+        """
+        warm_start(self.network, self.routing_protocol, samples_per_link, seed_value, self.time_grid)
+
+    def run(self, time: float, seed_value: int = DEFAULT_SEED,
+            tolerance: Optional[float] = None,
+            check_period: float = DEFAULT_CHECK_PERIOD,
+            confidence: float = DEFAULT_CONFIDENCE) -> None:
+        """Runs the simulation for a given time in seconds.
+
+        Every link with a batch or random delay source and every node
+        tie-breaker gets its own stream spawned from 'seed_value'.
+
+        With a 'tolerance', 'time' is the maximum: every 'check_period' the
+        warm-up is removed (MSER-5) and the simulation stops when the
+        half-width of the DMR confidence interval of every sensing node is
+        below the tolerance, see stopping.py. It needs every message received
+        by the sink in its log.
+        """
+        if tolerance is not None and self._sink_received_messages().retention.limit is not None:
+            raise ValueError("A tolerance needs the full retention of the 'received' log")
+        seed(seed_value)  # Restart the seed, used by delay functions with the global random module
+        for link in self.network.links:
+            link.seed_delay_source(seed_value)
+        for node in self.network.nodes:
+            node.seed_random_streams(seed_value)
+        try:
+            if tolerance is None:
+                self.env.run(until=time)
+            else:
+                self._run_until_precision(time, tolerance, check_period, confidence)
+        finally:
+            self.tracer.flush()
+            if self.trace_sink is not None:
+                self.trace_sink.flush()
+
+    def _run_until_precision(self, time: float, tolerance: float, check_period: float, confidence: float) -> None:
+        """Runs the simulation in chunks until the DMR of every sensing node is precise enough."""
+        sensing_nodes = {node.address for node in self.network.nodes if isinstance(node, SimulationSensingNode)}
+        while self.env.now < time:
+            self.env.run(until=min(self.env.now + check_period, time))
+            self.warm_up_time, self.dmr_half_widths = dmr_precision(self._sink_received_messages(),
+                                                                    self.deadline, confidence)
+            if set(self.dmr_half_widths) >= sensing_nodes and \
+                    all(half_width <= tolerance for half_width in self.dmr_half_widths.values()):
+                break
+
+    def _sink_received_messages(self) -> EventLog:
+        """Returns the log of the messages received by the sink."""
+        return get_sink_node(self.network.nodes).routing_protocol.recorder.received
+
+    def report(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, NodeReport]:
+        """Returns the performance of every sensing node, without plotting.
+
+        The warm-up found by run() with a tolerance is discarded.
+        """
+        return NetworkPerformance(self.network, self.deadline).report(quantiles, start_time=self.warm_up_time)
 
     def show_performance(self):
         """Calls a routine to show the performance of the simulation."""
-        NetworkPerformance(self.network, self.deadline)
+        NetworkPerformance(self.network, self.deadline).show_end_to_end_statistics()
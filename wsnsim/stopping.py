@@ -0,0 +1,92 @@
+"""Sequential stopping rule of the simulations, with warm-up removal.
+
+The deliveries of every sensing node at the sink form a series of deadline
+misses (1) and hits (0), in order of arrival. The initial transient of every
+series is found with MSER-5 and the deliveries before the latest truncation
+point are discarded. The half-width of the confidence interval of the DMR of
+every node is estimated with non-overlapping batch means, and it is never
+below the one of the Wilson score interval of the deliveries. Batch means
+of a series without misses (or only misses) have no variance, the Wilson
+interval still needs enough deliveries to bound a rare miss.
+"""
+
+from math import sqrt, inf
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .recorder import EventLog, address_from_id
+from .packet import PacketKind
+
+MSER_BATCH_SIZE = 5  # MSER-5
+NUMBER_OF_BATCHES = 20  # Of the batch means, after the warm-up
+MIN_BATCH_SIZE = 5  # Fewer deliveries per batch do not give an interval
+
+
+def mser_truncation(values: np.ndarray, batch_size: int = MSER_BATCH_SIZE) -> int:
+    """Returns how many values of a series belong to its initial transient.
+
+    The values are averaged in batches and the truncation minimizes the
+    MSER statistic, the variance of the remaining batch means divided by
+    their number, among the first half of the batches.
+    """
+    number_of_batches = len(values) // batch_size
+    if number_of_batches < 2:
+        return 0
+    batch_means = values[:number_of_batches * batch_size].reshape(number_of_batches, batch_size).mean(axis=1)
+    # Sums of the remaining batch means for every truncation, computed from the end
+    sums = np.cumsum(batch_means[::-1])[::-1]
+    squared_sums = np.cumsum(batch_means[::-1] ** 2)[::-1]
+    remaining = np.arange(number_of_batches, 0, -1)
+    variances = squared_sums / remaining - (sums / remaining) ** 2
+    mser = variances / remaining
+    truncated_batches = int(np.argmin(mser[:number_of_batches // 2 + 1]))
+    return truncated_batches * batch_size
+
+
+def batch_means_half_width(values: np.ndarray, confidence: float,
+                           number_of_batches: int = NUMBER_OF_BATCHES) -> float:
+    """Returns the half-width of the confidence interval of the mean of a series, inf with few values."""
+    batch_size = len(values) // number_of_batches
+    if batch_size < MIN_BATCH_SIZE:
+        return inf
+    from scipy.stats import t
+
+    batch_means = values[:number_of_batches * batch_size].reshape(number_of_batches, batch_size).mean(axis=1)
+    standard_error = batch_means.std(ddof=1) / sqrt(number_of_batches)
+    return float(t.ppf((1 + confidence) / 2, number_of_batches - 1) * standard_error)
+
+
+def wilson_half_width(misses: np.ndarray, confidence: float) -> float:
+    """Returns the half-width of the Wilson score interval of the miss ratio of a series, inf without values."""
+    number_of_values = len(misses)
+    if number_of_values == 0:
+        return inf
+    from scipy.stats import norm
+
+    z = norm.ppf((1 + confidence) / 2)
+    ratio = float(misses.mean())
+    return float(z / (1 + z ** 2 / number_of_values)
+                 * sqrt(ratio * (1 - ratio) / number_of_values + z ** 2 / (4 * number_of_values ** 2)))
+
+
+def dmr_precision(received_messages: EventLog, deadline: float,
+                  confidence: float) -> Tuple[float, Dict[str, float]]:
+    """Returns the end of the warm-up and the half-width of the DMR of every source after it."""
+    data = received_messages.column('kind') == PacketKind.DATA
+    sources = received_messages.column('source')[data]
+    arrivals = received_messages.column('timestamp')[data]
+    misses = (arrivals - received_messages.column('created')[data]) > deadline
+    warm_up_time = 0.0
+    for source in np.unique(sources):
+        of_source = sources == source
+        truncation = mser_truncation(misses[of_source].astype(float))
+        if truncation:
+            warm_up_time = max(warm_up_time, float(arrivals[of_source][truncation]))
+    after_warm_up = arrivals >= warm_up_time
+    half_widths = {}
+    for source in np.unique(sources):
+        source_misses = misses[(sources == source) & after_warm_up].astype(float)
+        half_widths[address_from_id(source)] = max(batch_means_half_width(source_misses, confidence),
+                                                   wilson_half_width(source_misses, confidence))
+    return warm_up_time, half_widths
@@ -0,0 +1,274 @@
+"""Parameter sweeps with a cache of the results on disk.
+
+Every combination of the values of the parameters (a point) is simulated for
+every seed. A result is saved under the hash of the whole configuration (the
+value of every parameter, swept or not, the seed, the simulated time and a
+fingerprint of the network), so running an edited sweep only simulates the
+missing points.
+
+The parameters that can be swept are:
+- Arguments of Simulation: 'routing_protocol', 'deadline', 'time_grid' and 'link_estimator'.
+- Class tunables of the protocols: 'probe_packet_rate', 'dap_share_period', 'etx_share_period'
+  and 'dap_encoding'.
+- 'sensing_period', of every sensing node of the network.
+
+The network fingerprint uses the code, constants, defaults and closures of
+the delay functions (and the samplers of BatchDelay and RandomDelay), but not
+the global names they use; give 'network_key' if the delays depend on
+anything else or cannot be fingerprinted.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from functools import partial
+from itertools import product
+from types import FunctionType
+from typing import Dict, List, Iterable, Any, Optional, Sequence, Tuple
+
+from .link import BatchDelay, RandomDelay
+from .link_estimator import DEFAULT_LINK_ESTIMATOR
+from .network import Network
+from .node import SensingNode
+from .performance import NodeReport, DEFAULT_QUANTILES
+from .replications import map_in_processes
+from .routing import DAPRouting, DAPRoutingSink, ETX, ETXSink
+from .simulation import Simulation, DEFAULT_SEED
+from .time_grid import DEFAULT_TIME_GRID
+
+SIMULATION_PARAMETERS = ('routing_protocol', 'deadline', 'time_grid', 'link_estimator')
+# Classes whose attribute is changed by every protocol parameter
+PROTOCOL_PARAMETERS = {
+    'probe_packet_rate': (DAPRouting, ETX),
+    'dap_share_period': (DAPRouting, DAPRoutingSink),
+    'etx_share_period': (ETX, ETXSink),
+    'dap_encoding': (DAPRouting, DAPRoutingSink),
+}
+NETWORK_PARAMETERS = ('sensing_period',)
+_INHERITED = object()  # Previous value of a class attribute that was inherited
+# Default representation of an object, it changes from one process to another
+_MEMORY_ADDRESS = re.compile(r' at 0x[0-9a-fA-F]+>')
+
+# Arguments of the sweep, inherited by the forked workers
+_sweep_setup: Optional[Tuple] = None
+
+
+class SweepResult:
+    """Performance of every sensing node for one point of a sweep and one seed."""
+
+    def __init__(self, point: Dict[str, Any], seed_value: int, key: str,
+                 reports: Dict[str, NodeReport], cached: bool) -> None:
+        self.point = point
+        self.seed_value = seed_value
+        self.key = key  # Hash of the configuration, name of the file in the cache
+        self.reports = reports
+        self.cached = cached  # Read from the cache instead of simulated
+
+    def __repr__(self):
+        return f'(Point: {self.point}, Seed: {self.seed_value}, Cached: {self.cached})'
+
+    __str__ = __repr__
+
+
+def expand_grid(parameters: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Returns every combination of the values of the parameters."""
+    for name in parameters:
+        if name not in SIMULATION_PARAMETERS and name not in PROTOCOL_PARAMETERS and name not in NETWORK_PARAMETERS:
+            raise ValueError(f'{name} is not a parameter that can be swept')
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in product(*(parameters[name] for name in names))]
+
+
+def network_fingerprint(network: Network) -> str:
+    """Returns a text that changes when the nodes, the links or the delay functions change."""
+    nodes = [(node.address, type(node).__name__, getattr(node, 'sensing_period', None),
+              getattr(node, 'sensing_offset', None)) for node in network.nodes]
+    # noinspection PyProtectedMember
+    links = sorted((tuple(node.address for node in link.nodes), _function_fingerprint(link._delay_function))
+                   for link in network.links)
+    return repr((nodes, links))
+
+
+def configuration_key(point: Dict[str, Any], seed_value: int, time: float, network_key: str,
+                      quantiles: Tuple[float, ...]) -> str:
+    """Returns the hash of the whole configuration of a simulation."""
+    configuration = {
+        'parameters': effective_parameters(point),
+        'seed': seed_value,
+        'time': time,
+        'network': network_key,
+        'quantiles': quantiles,
+    }
+    return hashlib.sha256(json.dumps(configuration, sort_keys=True).encode()).hexdigest()
+
+
+def effective_parameters(point: Dict[str, Any]) -> Dict[str, str]:
+    """Returns the representation of the value of every parameter in a point, swept or not.
+
+    The parameters that are not swept take the defaults of Simulation and the
+    current class tunables of the protocols.
+    """
+    parameters = {'time_grid': repr(DEFAULT_TIME_GRID), 'link_estimator': repr(DEFAULT_LINK_ESTIMATOR)}
+    for name, owners in PROTOCOL_PARAMETERS.items():
+        parameters[name] = repr([getattr(owner, name) for owner in owners])
+    parameters.update((name, repr(value)) for name, value in point.items())
+    return parameters
+
+
+def run_sweep(network: Network, parameters: Dict[str, Sequence[Any]], time: float, cache_directory: str,
+              seeds: Iterable[int] = (DEFAULT_SEED,), workers: Optional[int] = None,
+              quantiles: Iterable[float] = DEFAULT_QUANTILES,
+              network_key: Optional[str] = None) -> List[SweepResult]:
+    """Simulates every point of the parameter grid for every seed, reusing the cached results.
+
+    'routing_protocol' and 'deadline' must be given, every parameter takes a
+    list of values. The results are in the order of the points and then of
+    the seeds. 'workers' is the number of processes, every core is used if it
+    is not given.
+    """
+    global _sweep_setup
+    if 'routing_protocol' not in parameters or 'deadline' not in parameters:
+        raise ValueError("'routing_protocol' and 'deadline' must be swept")
+    quantiles = tuple(quantiles)
+    if network_key is None:
+        network_key = network_fingerprint(network)
+    configurations = [(point, seed_value, configuration_key(point, seed_value, time, network_key, quantiles))
+                      for point in expand_grid(parameters) for seed_value in seeds]
+    results = {}
+    missing = []
+    for point, seed_value, key in configurations:
+        reports = _read_cached_reports(cache_directory, key)
+        if reports is None:
+            missing.append((point, seed_value, key))
+        else:
+            results[key] = SweepResult(point, seed_value, key, reports, cached=True)
+    _sweep_setup = (network, time, quantiles)
+    try:
+        simulated = map_in_processes(_run_point, [(point, seed_value) for point, seed_value, _ in missing], workers)
+    finally:
+        _sweep_setup = None
+    for (point, seed_value, key), reports in zip(missing, simulated):
+        _write_cached_reports(cache_directory, key, point, seed_value, reports)
+        results[key] = SweepResult(point, seed_value, key, reports, cached=False)
+    return [results[key] for _, _, key in configurations]
+
+
+def _run_point(configuration: Tuple[Dict[str, Any], int]) -> Dict[str, NodeReport]:
+    """Simulates a point of a sweep with the arguments of _sweep_setup."""
+    network, time, quantiles = _sweep_setup
+    point, seed_value = configuration
+    # The tunables are class attributes and node attributes, restored after the run.
+    # An attribute inherited by a class is removed again, so it follows its base class
+    previous_values = []
+    try:
+        for name, value in point.items():
+            for owner in PROTOCOL_PARAMETERS.get(name, ()):
+                previous_values.append((owner, name, vars(owner).get(name, _INHERITED)))
+                setattr(owner, name, value)
+            if name in NETWORK_PARAMETERS:
+                for node in network.nodes:
+                    if isinstance(node, SensingNode):
+                        previous_values.append((node, name, getattr(node, name)))
+                        setattr(node, name, value)
+        simulation_arguments = {name: value for name, value in point.items() if name in SIMULATION_PARAMETERS}
+        simulation = Simulation(network, **simulation_arguments)
+        simulation.run(time, seed_value)
+        return simulation.report(quantiles)
+    finally:
+        for owner, name, value in reversed(previous_values):
+            if value is _INHERITED:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, value)
+
+
+def _cache_path(cache_directory: str, key: str) -> str:
+    """Returns the file of a result in the cache."""
+    return os.path.join(cache_directory, key[:2], f'{key}.json')
+
+
+def _read_cached_reports(cache_directory: str, key: str) -> Optional[Dict[str, NodeReport]]:
+    """Returns the cached reports of a configuration, None if they are not cached."""
+    try:
+        with open(_cache_path(cache_directory, key)) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return {address: NodeReport.from_dict(report) for address, report in cached['reports'].items()}
+
+
+def _write_cached_reports(cache_directory: str, key: str, point: Dict[str, Any], seed_value: int,
+                          reports: Dict[str, NodeReport]) -> None:
+    """Saves the reports of a configuration in the cache, atomically."""
+    path = _cache_path(cache_directory, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cached = {
+        'point': {name: repr(value) for name, value in point.items()},
+        'seed': seed_value,
+        'reports': {address: report.as_dict() for address, report in reports.items()},
+    }
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(cached, file)
+    os.replace(temporary_path, path)
+
+
+def _function_fingerprint(function: Any) -> str:
+    """Returns a text that identifies what a delay function computes.
+
+    The delay sources are identified by their sampler and parameters, the
+    initial seed is left out because every run restarts them. Callables that
+    cannot be identified without their memory address raise ValueError.
+    """
+    # noinspection PyProtectedMember
+    if isinstance(function, BatchDelay):
+        return f'BatchDelay({_function_fingerprint(function._sampler)}, {function.block_size})'
+    # noinspection PyProtectedMember
+    if isinstance(function, RandomDelay):
+        return f'RandomDelay({_function_fingerprint(function._sampler)})'
+    if isinstance(function, partial):
+        arguments = [_value_fingerprint(value) for value in function.args]
+        keywords = {name: _value_fingerprint(value) for name, value in function.keywords.items()}
+        return f'partial({_function_fingerprint(function.func)}, {arguments}, {sorted(keywords.items())})'
+    if not isinstance(function, FunctionType):
+        # Built-in functions and methods of the random module are identified by their name
+        module_name = _module_name(function)
+        if module_name is None:
+            raise ValueError(f'{function!r} cannot be fingerprinted, give network_key to run_sweep()')
+        return module_name
+    closure = [_value_fingerprint(cell.cell_contents) for cell in function.__closure__ or ()]
+    defaults = [_value_fingerprint(value) for value in function.__defaults__ or ()]
+    return repr((_code_fingerprint(function.__code__), defaults, closure))
+
+
+def _module_name(function: Any) -> Optional[str]:
+    """Returns the name of a function of a module, e.g. 'random.expovariate', None for anything else."""
+    name = getattr(function, '__name__', None)
+    module = getattr(function, '__module__', None)
+    if module is None and hasattr(function, '__self__'):
+        # Methods of the generator of the random module do not have a module
+        module = type(function.__self__).__module__
+    if name is None or module not in sys.modules:
+        return None
+    if getattr(sys.modules[module], name, None) != function:
+        return None
+    return f'{module}.{name}'
+
+
+def _code_fingerprint(code) -> str:
+    """Returns a text that identifies a code object, without its memory address."""
+    constants = [_code_fingerprint(constant) if hasattr(constant, 'co_code') else repr(constant)
+                 for constant in code.co_consts]
+    return repr((code.co_code, constants, code.co_names))
+
+
+def _value_fingerprint(value: Any) -> str:
+    """Returns a text that identifies a value captured by a delay function."""
+    if callable(value):
+        return _function_fingerprint(value)
+    text = repr(value)
+    if _MEMORY_ADDRESS.search(text):
+        raise ValueError(f'{text} cannot be fingerprinted, give network_key to run_sweep()')
+    return text
@@ -0,0 +1,108 @@
+"""Bins of delays and deadlines used by the delay pdfs and the DAPs.
+
+A grid is immutable and shared, so creating a DAP or a delay pdf does not
+build its bins again. The bins are given by their upper limits (edges); the
+last bin, with an infinite limit, holds every larger delay.
+"""
+
+from math import ceil, inf
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .auxiliary_functions import float_range, find_index_of_delay
+
+PDF_AND_DAP_RESOLUTION = 1  # In seconds
+PDF_AND_DAP_DURATION = 30  # In seconds
+EDGE_TOLERANCE = 1e-9  # Sums of edges closer than this to an edge fall in its bin
+
+
+class TimeGrid:
+    """Immutable bins of time, uniform or not."""
+
+    __slots__ = ('edges', 'resolution', 'duration', '_last', '_sum_indexes')
+
+    def __init__(self, edges: Iterable[float], resolution: Optional[float] = None,
+                 duration: Optional[float] = None) -> None:
+        edges = tuple(float(edge) for edge in edges)
+        if not edges:
+            raise ValueError('A time grid needs at least one bin')
+        if edges[0] < 0 or any(edge >= next_edge for edge, next_edge in zip(edges, edges[1:])):
+            raise ValueError('The edges of a time grid must be positive and increasing')
+        if duration is None:
+            duration = edges[-1] if resolution is None else edges[-1] + resolution
+        # The attributes cannot be set again, see __setattr__()
+        set_attribute = super().__setattr__
+        # The infinite edge is added at the end
+        set_attribute('edges', edges + (inf,))
+        # Only set for uniform grids, it allows finding a bin arithmetically
+        set_attribute('resolution', resolution)
+        set_attribute('duration', duration)
+        set_attribute('_last', len(self.edges) - 1)
+        set_attribute('_sum_indexes', None)
+
+    @classmethod
+    def uniform(cls, resolution: float = PDF_AND_DAP_RESOLUTION,
+                duration: float = PDF_AND_DAP_DURATION) -> 'TimeGrid':
+        """Grid with bins of 'resolution' seconds from 0 to 'duration'."""
+        if resolution <= 0 or duration <= 0:
+            raise ValueError('The resolution and the duration must be positive')
+        return cls(float_range(0, duration, resolution), resolution, duration)
+
+    def index(self, delay: float) -> int:
+        """Returns the first bin whose edge is greater or equal than the delay."""
+        if self.resolution is None:
+            return find_index_of_delay(delay, self.edges)
+        edges = self.edges
+        if delay <= 0:
+            return 0
+        if delay > edges[-2]:
+            return self._last
+        index = ceil(delay / self.resolution)
+        # Correction of the rounding errors near the edges
+        if index > 0 and edges[index - 1] >= delay:
+            index -= 1
+        elif edges[index] < delay:
+            index += 1
+        return index
+
+    @property
+    def sum_indexes(self) -> np.ndarray:
+        """Bin of the sum of the edges of every pair of bins, used to convolve."""
+        if self._sum_indexes is None:
+            finite_edges = np.array(self.edges[:-1])
+            sums = finite_edges[:, np.newaxis] + finite_edges[np.newaxis, :]
+            sum_indexes = np.full((len(self), len(self)), self._last, dtype=np.intp)
+            sum_indexes[:-1, :-1] = np.searchsorted(finite_edges, sums - EDGE_TOLERANCE, side='left')
+            sum_indexes.flags.writeable = False
+            # Only a cache of values computed from the edges
+            super().__setattr__('_sum_indexes', sum_indexes)
+        return self._sum_indexes
+
+    def __setattr__(self, name, value):
+        raise AttributeError('A time grid is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('A time grid is immutable')
+
+    def __reduce__(self):
+        return TimeGrid, (self.edges[:-1], self.resolution, self.duration)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def __eq__(self, other):
+        return isinstance(other, TimeGrid) and other.edges == self.edges
+
+    def __hash__(self):
+        return hash(self.edges)
+
+    def __repr__(self):
+        if self.resolution is not None:
+            return f'TimeGrid.uniform({self.resolution}, {self.duration})'
+        return f'TimeGrid({list(self.edges[:-1])})'
+
+    __str__ = __repr__
+
+
+DEFAULT_TIME_GRID = TimeGrid.uniform()
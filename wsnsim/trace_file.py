@@ -0,0 +1,181 @@
+"""Streams the events of a simulation to a binary file on disk.
+
+The file is append-only: a header followed by chunks compressed with zlib.
+An event chunk holds a fixed number of records stored column by column (all
+timestamps, then all kinds, ...). The columns are the ones of the recorder
+plus the type of event, see TRACE_COLUMNS. An address chunk holds the
+addresses that got an id since the previous chunk. The broadcast address is
+not in them, its reserved id is BROADCAST_ID.
+
+read_trace() decompresses the file, one chunk at a time, into a column file
+that is memory-mapped, so neither writing nor reading keeps the whole trace
+in memory.
+"""
+
+import struct
+import zlib
+from typing import Dict, Optional, Iterator, Tuple
+
+import numpy as np
+
+from .packet import Packet, BROADCAST
+from .recorder import EventType, EVENT_COLUMNS, BROADCAST_ID, address_id, known_addresses
+
+MAGIC = b'WSNTRACE'
+VERSION = 1
+_HEADER = struct.Struct('<8sH')  # Magic and version
+_CHUNK_HEADER = struct.Struct('<cII')  # Type, records and compressed bytes of a chunk
+_EVENT_CHUNK = b'E'
+_ADDRESS_CHUNK = b'A'
+
+TRACE_COLUMNS = {'event': np.int8, **EVENT_COLUMNS}
+DEFAULT_CHUNK_RECORDS = 65536
+
+
+class TraceSink:
+    """Receives events and appends them, in compressed chunks, to a trace file."""
+
+    def __init__(self, path: str, chunk_records: int = DEFAULT_CHUNK_RECORDS, compression_level: int = 6) -> None:
+        self.path = path
+        self._chunk_records = chunk_records
+        self._compression_level = compression_level
+        self._columns = {name: np.zeros(chunk_records, dtype=dtype) for name, dtype in TRACE_COLUMNS.items()}
+        self._count = 0  # Records waiting in the current chunk
+        self.total = 0  # Records received
+        self._addresses_written = 0  # Addresses with id already in the file
+        # Address ids are only valid in this process, so every sink starts a new file
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+
+    def record(self, event: EventType, timestamp: float, packet: Packet, node: int, peer: Optional[str]) -> None:
+        """Adds an event to the current chunk."""
+        index = self._count
+        columns = self._columns
+        columns['event'][index] = event
+        columns['timestamp'][index] = timestamp
+        columns['kind'][index] = packet.kind
+        columns['node'][index] = node
+        columns['peer'][index] = address_id(peer)
+        columns['packet'][index] = packet.packet_id
+        columns['source'][index] = address_id(packet.source)
+        columns['created'][index] = packet.timestamp
+        self._count += 1
+        self.total += 1
+        if self._count == self._chunk_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the records of the current chunk to the file."""
+        if self._count == 0 or self._file is None:
+            return
+        # The addresses must be in the file before the events that use them
+        addresses = known_addresses()
+        if self._addresses_written < len(addresses):
+            new_addresses = addresses[self._addresses_written:]
+            lines = '\n'.join(f'{self._addresses_written + index}\t{address}'
+                              for index, address in enumerate(new_addresses))
+            self._write_chunk(_ADDRESS_CHUNK, len(new_addresses), lines.encode())
+            self._addresses_written += len(new_addresses)
+        raw_chunk = b''.join(column[:self._count].tobytes() for column in self._columns.values())
+        self._write_chunk(_EVENT_CHUNK, self._count, raw_chunk)
+        self._file.flush()
+        self._count = 0
+
+    def _write_chunk(self, chunk_type: bytes, records: int, raw_chunk: bytes) -> None:
+        """Compresses and appends a chunk to the file."""
+        compressed_chunk = zlib.compress(raw_chunk, self._compression_level)
+        self._file.write(_CHUNK_HEADER.pack(chunk_type, records, len(compressed_chunk)))
+        self._file.write(compressed_chunk)
+
+    def close(self) -> None:
+        """Writes the pending records and closes the file."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> 'TraceSink':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _check_header(path: str) -> None:
+    """Raises an exception if the file is not a trace file of this version."""
+    with open(path, 'rb') as file:
+        magic, version = _HEADER.unpack(file.read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a trace file')
+    if version != VERSION:
+        raise ValueError(f'Version {version} of trace files is not supported')
+
+
+def _iterate_chunks(path: str) -> Iterator[Tuple[bytes, int, bytes]]:
+    """Yields the type, number of records and compressed bytes of every chunk."""
+    _check_header(path)
+    with open(path, 'rb') as file:
+        file.seek(_HEADER.size)
+        while True:
+            chunk_header = file.read(_CHUNK_HEADER.size)
+            if len(chunk_header) < _CHUNK_HEADER.size:
+                return
+            chunk_type, records, compressed_size = _CHUNK_HEADER.unpack(chunk_header)
+            compressed_chunk = file.read(compressed_size)
+            if len(compressed_chunk) < compressed_size:
+                # The last chunk was not completely written
+                return
+            yield chunk_type, records, compressed_chunk
+
+
+def read_trace(path: str, columns_path: Optional[str] = None) -> Dict[str, np.memmap]:
+    """Returns the columns of a trace file as memory-mapped NumPy arrays.
+
+    The columns are decompressed into 'columns_path' (the trace path plus
+    '.columns' if it is not given), which can be deleted after the analysis.
+    """
+    if columns_path is None:
+        columns_path = path + '.columns'
+    total_records = sum(records for chunk_type, records, _ in _iterate_chunks(path)
+                        if chunk_type == _EVENT_CHUNK)
+    # Offset of every column inside the column file
+    offsets = {}
+    column_file_size = 0
+    for name, dtype in TRACE_COLUMNS.items():
+        offsets[name] = column_file_size
+        column_file_size += total_records * np.dtype(dtype).itemsize
+    if total_records == 0:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in TRACE_COLUMNS.items()}
+    with open(columns_path, 'wb') as column_file:
+        column_file.truncate(column_file_size)
+    columns = {name: np.memmap(columns_path, dtype=dtype, mode='r+', offset=offsets[name], shape=(total_records,))
+               for name, dtype in TRACE_COLUMNS.items()}
+    position = 0
+    for chunk_type, records, compressed_chunk in _iterate_chunks(path):
+        if chunk_type != _EVENT_CHUNK:
+            continue
+        raw_chunk = zlib.decompress(compressed_chunk)
+        chunk_offset = 0
+        for name, dtype in TRACE_COLUMNS.items():
+            column_bytes = records * np.dtype(dtype).itemsize
+            columns[name][position:position + records] = np.frombuffer(
+                raw_chunk, dtype=dtype, count=records, offset=chunk_offset)
+            chunk_offset += column_bytes
+        position += records
+    for column in columns.values():
+        column.flush()
+    return {name: np.memmap(columns_path, dtype=dtype, mode='r', offset=offsets[name], shape=(total_records,))
+            for name, dtype in TRACE_COLUMNS.items()}
+
+
+def read_trace_addresses(path: str) -> Dict[int, str]:
+    """Returns the address that corresponds to every id used in a trace file."""
+    addresses = {BROADCAST_ID: BROADCAST}
+    for chunk_type, _, compressed_chunk in _iterate_chunks(path):
+        if chunk_type != _ADDRESS_CHUNK:
+            continue
+        for line in zlib.decompress(compressed_chunk).decode().split('\n'):
+            identifier, address = line.split('\t', 1)
+            addresses[int(identifier)] = address
+    return addresses
@@ -0,0 +1,67 @@
+"""Tracing of the events of the nodes, disabled by default.
+
+The call sites compare an integer level before building any text, so a
+disabled tracer costs almost nothing. An enabled tracer buffers the lines and
+writes them to a file handle in blocks.
+"""
+
+import sys
+from enum import IntEnum
+from typing import Optional, Iterable, TextIO, List
+
+from .packet import PacketKind
+
+DEFAULT_BUFFER_LINES = 10000  # Lines kept before writing them to the file
+DEFAULT_LINE_LIMIT = 200  # Characters of information shown per line
+
+
+class TraceLevel(IntEnum):
+    """How much information is traced."""
+    OFF = 0
+    INFO = 1  # Node events: awake, neighbours updated, data reaching the sink
+    PACKET = 2  # Also every packet sent and received
+
+
+class Tracer:
+    """Writes the information of the nodes, filtered by level, node and kind of packet."""
+
+    def __init__(self,
+                 file: Optional[TextIO] = None,
+                 level: TraceLevel = TraceLevel.PACKET,
+                 nodes: Optional[Iterable[str]] = None,
+                 kinds: Optional[Iterable[PacketKind]] = None,
+                 buffer_lines: int = DEFAULT_BUFFER_LINES,
+                 line_limit: int = DEFAULT_LINE_LIMIT) -> None:
+        self._file = file
+        self.level = level
+        self._nodes = None if nodes is None else frozenset(nodes)
+        # Kinds of packets traced, every kind if it is not given
+        self.kinds = frozenset(PacketKind) if kinds is None else frozenset(kinds)
+        self._buffer_lines = buffer_lines
+        self._line_limit = line_limit
+        self._lines: List[str] = []
+
+    def level_for(self, address: str) -> TraceLevel:
+        """Returns the trace level of a node, OFF if the node is filtered."""
+        if self._nodes is not None and address not in self._nodes:
+            return TraceLevel.OFF
+        return self.level
+
+    def write(self, now: float, address: str, info: str) -> None:
+        """Adds a line of information to the buffer."""
+        self._lines.append(f'{now:.2f} | {address} | {info[:self._line_limit]}\n')
+        if len(self._lines) >= self._buffer_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered lines to the file."""
+        if not self._lines:
+            return
+        # sys.stdout is looked up here, so redirections made later are respected
+        file = self._file if self._file is not None else sys.stdout
+        file.write(''.join(self._lines))
+        file.flush()
+        self._lines = []
+
+
+DISABLED_TRACER = Tracer(level=TraceLevel.OFF)